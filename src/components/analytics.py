@@ -3,15 +3,17 @@
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 
 from ..config import CURRENCY_SYMBOL
+from ..utils.data_loader import dataframe_fingerprint, session_fingerprint, remaining_days_slice
 from ..utils.history import (
     load_history,
     record_monthly_snapshot,
     get_expense_trend,
-    calculate_growth_rate
+    compute_growth_rate
 )
 
 
@@ -52,17 +54,21 @@ def render_analytics(df: pd.DataFrame):
     render_snapshot_section(df)
 
 
-def render_expense_pie_chart(df: pd.DataFrame):
-    """渲染支出构成饼图"""
-    st.markdown("### 💸 按服务类型的月均支出分布")
+@st.cache_data(show_spinner=False)
+def _expense_pie_figure(df_hash: str, currency_symbol: str, _category_expenses: pd.DataFrame) -> dict:
+    """
+    构建支出构成饼图（缓存序列化后的 figure 字典，命中时跳过构建与序列化）
     
-    # 按服务性质分组
-    category_expenses = df.groupby('服务性质')['月均成本'].sum().reset_index()
-    category_expenses = category_expenses.sort_values('月均成本', ascending=False)
+    Args:
+        df_hash: 订阅数据指纹（缓存键）
+        currency_symbol: 货币符号
+        _category_expenses: 按服务性质汇总的支出（不参与哈希）
     
-    # 创建饼图
+    Returns:
+        dict: plotly figure 字典
+    """
     fig = px.pie(
-        category_expenses,
+        _category_expenses,
         values='月均成本',
         names='服务性质',
         title='',
@@ -74,7 +80,7 @@ def render_expense_pie_chart(df: pd.DataFrame):
     fig.update_traces(
         textposition='inside',
         textinfo='percent+label',
-        hovertemplate='<b>%{label}</b><br>月均: ' + CURRENCY_SYMBOL + '%{value:.2f}<br>占比: %{percent}<extra></extra>'
+        hovertemplate='<b>%{label}</b><br>月均: ' + currency_symbol + '%{value:.2f}<br>占比: %{percent}<extra></extra>'
     )
     
     fig.update_layout(
@@ -83,17 +89,40 @@ def render_expense_pie_chart(df: pd.DataFrame):
         margin=dict(t=30, b=30, l=30, r=30)
     )
     
-    st.plotly_chart(fig, width="stretch")
+    return fig.to_plotly_json()
+
+
+def render_expense_pie_chart(df: pd.DataFrame):
+    """渲染支出构成饼图"""
+    st.markdown("### 💸 按服务类型的月均支出分布")
     
+    # 按服务性质分组：一次 groupby 同时得到支出合计与服务数量
+    category_expenses = (
+        df.groupby('服务性质', sort=False, observed=True)['月均成本']
+        .agg(月均成本='sum', 数量='size')
+        .sort_values('月均成本', ascending=False)
+        .reset_index()
+    )
+    total_cost = category_expenses['月均成本'].sum()
+    
+    st.plotly_chart(
+        _expense_pie_figure(session_fingerprint(df), CURRENCY_SYMBOL, category_expenses),
+        width="stretch"
+    )
+
     # 数据表格
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("#### 📊 详细数据")
-        display_df = category_expenses.copy()
-        display_df['占比'] = (display_df['月均成本'] / display_df['月均成本'].sum() * 100).round(1)
-        display_df['月均成本'] = display_df['月均成本'].apply(lambda x: f"{CURRENCY_SYMBOL}{x:.2f}")
-        display_df['占比'] = display_df['占比'].apply(lambda x: f"{x}%")
+        # 直接由 numpy 数组构建展示表，避免逐元素 apply
+        sums = category_expenses['月均成本'].to_numpy(dtype=np.float64)
+        percentage = (sums / total_cost * 100).round(1)
+        display_df = pd.DataFrame({
+            '服务性质': category_expenses['服务性质'].to_numpy(dtype=object),
+            '月均成本': np.char.add(CURRENCY_SYMBOL, np.char.mod('%.2f', sums)),
+            '占比': np.char.add(percentage.astype(str), '%'),
+        })
         
         st.dataframe(
             display_df,
@@ -106,7 +135,7 @@ def render_expense_pie_chart(df: pd.DataFrame):
         
         # 找出最大支出类型
         max_category = category_expenses.iloc[0]
-        max_percentage = (max_category['月均成本'] / category_expenses['月均成本'].sum()) * 100
+        max_percentage = (max_category['月均成本'] / total_cost) * 100
         
         st.info(f"""
         **主要支出**: {max_category['服务性质']}
@@ -115,105 +144,177 @@ def render_expense_pie_chart(df: pd.DataFrame):
         """)
         
         # 服务数量统计
-        category_count = df['服务性质'].value_counts()
+        category_count = category_expenses.set_index('服务性质')['数量'].sort_values(ascending=False, kind='stable')
         st.write(f"**服务数量分布**:")
         for cat, count in category_count.items():
             st.write(f"- {cat}: {count} 个")
 
 
+@st.cache_data(show_spinner=False)
+def _subscription_type_figures(df_hash: str, currency_symbol: str, _df: pd.DataFrame) -> tuple[dict, dict]:
+    """
+    构建订阅周期的数量/支出柱状图（缓存序列化后的 figure 字典）
+    
+    Args:
+        df_hash: 订阅数据指纹（缓存键）
+        currency_symbol: 货币符号
+        _df: 订阅数据框（不参与哈希）
+        
+    Returns:
+        tuple: (数量分布 figure 字典, 支出分布 figure 字典)
+    """
+    # 数量分布
+    type_count = _df['订阅类型'].value_counts().reset_index()
+    type_count.columns = ['订阅类型', '数量']
+    
+    count_fig = px.bar(
+        type_count,
+        x='订阅类型',
+        y='数量',
+        title='订阅数量分布',
+        color='订阅类型',
+        text='数量'
+    )
+    
+    count_fig.update_traces(textposition='outside')
+    count_fig.update_layout(
+        showlegend=False,
+        height=300,
+        margin=dict(t=30, b=30, l=30, r=30)
+    )
+    
+    # 支出分布
+    type_expense = _df.groupby('订阅类型', observed=True)['月均成本'].sum().reset_index()
+    type_expense.columns = ['订阅类型', '月均成本']
+    
+    expense_fig = px.bar(
+        type_expense,
+        x='订阅类型',
+        y='月均成本',
+        title='月均支出分布',
+        color='订阅类型',
+        text='月均成本'
+    )
+    
+    expense_fig.update_traces(
+        texttemplate=currency_symbol + '%{text:.2f}',
+        textposition='outside'
+    )
+    expense_fig.update_layout(
+        showlegend=False,
+        height=300,
+        margin=dict(t=30, b=30, l=30, r=30)
+    )
+    
+    return count_fig.to_plotly_json(), expense_fig.to_plotly_json()
+
+
 def render_subscription_type_chart(df: pd.DataFrame):
     """渲染订阅类型分布柱状图"""
     st.markdown("### 🔄 订阅周期分布")
     
+    count_fig, expense_fig = _subscription_type_figures(session_fingerprint(df), CURRENCY_SYMBOL, df)
+    
     col1, col2 = st.columns(2)
     
     with col1:
-        # 数量分布
-        type_count = df['订阅类型'].value_counts().reset_index()
-        type_count.columns = ['订阅类型', '数量']
-        
-        fig = px.bar(
-            type_count,
-            x='订阅类型',
-            y='数量',
-            title='订阅数量分布',
-            color='订阅类型',
-            text='数量'
-        )
-        
-        fig.update_traces(textposition='outside')
-        fig.update_layout(
-            showlegend=False,
-            height=300,
-            margin=dict(t=30, b=30, l=30, r=30)
-        )
-        
-        st.plotly_chart(fig, width="stretch")
+        st.plotly_chart(count_fig, width="stretch")
     
     with col2:
-        # 支出分布
-        type_expense = df.groupby('订阅类型')['月均成本'].sum().reset_index()
-        type_expense.columns = ['订阅类型', '月均成本']
-        
-        fig = px.bar(
-            type_expense,
-            x='订阅类型',
-            y='月均成本',
-            title='月均支出分布',
-            color='订阅类型',
-            text='月均成本'
-        )
-        
-        fig.update_traces(
-            texttemplate=CURRENCY_SYMBOL + '%{text:.2f}',
-            textposition='outside'
-        )
-        fig.update_layout(
-            showlegend=False,
-            height=300,
-            margin=dict(t=30, b=30, l=30, r=30)
-        )
-        
-        st.plotly_chart(fig, width="stretch")
+        st.plotly_chart(expense_fig, width="stretch")
 
 
-def render_trend_chart():
-    """渲染历史趋势图"""
-    st.markdown("### 📊 支出趋势分析")
-    
-    history_df = get_expense_trend(12)
-    
-    if history_df.empty:
-        st.info("📭 暂无历史数据。点击下方「记录当前快照」按钮开始追踪支出趋势。")
-        return
+@st.cache_data(show_spinner=False)
+def _trend_figure(history_hash: str, currency_symbol: str, _history_df: pd.DataFrame) -> dict:
+    """
+    构建月均支出趋势折线图（缓存序列化后的 figure 字典）
     
-    # 创建趋势折线图
+    Args:
+        history_hash: 历史数据指纹（缓存键）
+        currency_symbol: 货币符号
+        _history_df: 历史趋势数据（不参与哈希）
+        
+    Returns:
+        dict: plotly figure 字典
+    """
     fig = go.Figure()
     
     # 月均总支出趋势
     fig.add_trace(go.Scatter(
-        x=history_df['日期'],
-        y=history_df['月均总支出'],
+        x=_history_df['日期'],
+        y=_history_df['月均总支出'],
         mode='lines+markers',
         name='月均总支出',
         line=dict(color='#FF4B4B', width=3),
         marker=dict(size=8),
-        hovertemplate='%{x}<br>月均支出: ' + CURRENCY_SYMBOL + '%{y:.2f}<extra></extra>'
+        hovertemplate='%{x}<br>月均支出: ' + currency_symbol + '%{y:.2f}<extra></extra>'
     ))
     
     fig.update_layout(
         title='月均支出趋势',
         xaxis_title='日期',
-        yaxis_title=f'支出 ({CURRENCY_SYMBOL})',
+        yaxis_title=f'支出 ({currency_symbol})',
         height=350,
         hovermode='x unified',
         margin=dict(t=40, b=30, l=30, r=30)
     )
     
-    st.plotly_chart(fig, width="stretch")
+    return fig.to_plotly_json()
+
+
+@st.cache_data(show_spinner=False)
+def _category_trend_figure(history_hash: str, _history_df: pd.DataFrame) -> dict:
+    """
+    构建分类支出趋势折线图（缓存序列化后的 figure 字典）
     
-    # 增长率指标
-    growth_rate = calculate_growth_rate()
+    Args:
+        history_hash: 历史数据指纹（缓存键）
+        _history_df: 历史趋势数据（不参与哈希）
+        
+    Returns:
+        dict: plotly figure 字典
+    """
+    colors = {'AI': '#FF6B6B', '视频': '#4ECDC4', '软件': '#45B7D1', '系统': '#96CEB4'}
+    
+    # 宽表转长表，一次 px.line 生成全部分类曲线
+    value_cols = [f'{name}支出' for name in colors if f'{name}支出' in _history_df.columns]
+    long_df = _history_df[['日期'] + value_cols].melt('日期', var_name='类别', value_name='支出')
+    long_df['类别'] = long_df['类别'].str.removesuffix('支出')
+    
+    fig = px.line(
+        long_df,
+        x='日期',
+        y='支出',
+        color='类别',
+        markers=True,
+        color_discrete_map=colors
+    )
+    
+    fig.update_layout(
+        title='分类支出趋势',
+        height=300,
+        margin=dict(t=40, b=30, l=30, r=30)
+    )
+    
+    return fig.to_plotly_json()
+
+
+def render_trend_chart():
+    """渲染历史趋势图"""
+    st.markdown("### 📊 支出趋势分析")
+    
+    history_df = get_expense_trend(12)
+    
+    if history_df.empty:
+        st.info("📭 暂无历史数据。点击下方「记录当前快照」按钮开始追踪支出趋势。")
+        return
+    
+    # 创建趋势折线图
+    history_hash = dataframe_fingerprint(history_df)
+    st.plotly_chart(_trend_figure(history_hash, CURRENCY_SYMBOL, history_df), width="stretch")
+    
+    # 增长率指标（复用已加载的趋势数据，不再重新读取历史文件）
+    growth_rate = compute_growth_rate(history_df['月均总支出'].to_numpy())
     if growth_rate is not None:
         col1, col2, col3 = st.columns(3)
         
@@ -243,64 +344,64 @@ def render_trend_chart():
     # 分类趋势（可展开）
     with st.expander("📋 查看分类支出趋势"):
         if all(col in history_df.columns for col in ['AI支出', '视频支出', '软件支出']):
-            fig2 = go.Figure()
-            
-            colors = {'AI支出': '#FF6B6B', '视频支出': '#4ECDC4', '软件支出': '#45B7D1', '系统支出': '#96CEB4'}
-            
-            for col in ['AI支出', '视频支出', '软件支出', '系统支出']:
-                if col in history_df.columns:
-                    fig2.add_trace(go.Scatter(
-                        x=history_df['日期'],
-                        y=history_df[col],
-                        mode='lines+markers',
-                        name=col.replace('支出', ''),
-                        line=dict(color=colors.get(col, '#666'))
-                    ))
-            
-            fig2.update_layout(
-                title='分类支出趋势',
-                height=300,
-                margin=dict(t=40, b=30, l=30, r=30)
-            )
-            
-            st.plotly_chart(fig2, width="stretch")
+            st.plotly_chart(_category_trend_figure(history_hash, history_df), width="stretch")
 
 
-def render_timeline_chart(df: pd.DataFrame):
-    """渲染时间轴图表"""
-    st.markdown("### 📅 付费时间线")
-    
-    # 筛选未来 90 天内的付费事件
-    future_df = df[df['剩余天数'] >= 0].copy()
-    future_df = future_df.sort_values('下次付费时间')
-    
-    if future_df.empty:
-        st.info("📭 未来 90 天内无到期订阅")
-        return
-    
-    # 创建甘特图风格的时间线
-    fig = go.Figure()
+@st.cache_data(show_spinner=False)
+def _timeline_figure(df_hash: str, currency_symbol: str, _future_df: pd.DataFrame) -> dict:
+    """
+    构建付费时间线图（缓存序列化后的 figure 字典）
     
-    for idx, row in future_df.iterrows():
-        fig.add_trace(go.Scatter(
-            x=[row['下次付费时间'], row['下次付费时间']],
-            y=[0, 1],
-            mode='lines+markers+text',
-            name=row['名称'],
-            text=[row['名称'], f"{CURRENCY_SYMBOL}{row['金额']:.2f}"],
-            textposition='top center',
-            marker=dict(
-                size=15,
-                color='red' if row['自动续费'] else 'blue',
-                symbol='circle'
-            ),
-            line=dict(width=2),
-            hovertemplate=f"<b>{row['名称']}</b><br>" +
-                         f"日期: {row['下次付费时间'].strftime('%Y-%m-%d')}<br>" +
-                         f"金额: {CURRENCY_SYMBOL}{row['金额']:.2f}<br>" +
-                         f"剩余: {row['剩余天数']} 天<br>" +
-                         f"自动续费: {'是' if row['自动续费'] else '否'}<extra></extra>"
-        ))
+    Args:
+        df_hash: 订阅数据指纹（缓存键）
+        currency_symbol: 货币符号
+        _future_df: 未到期订阅（不参与哈希）
+        
+    Returns:
+        dict: plotly figure 字典
+    """
+    # 创建甘特图风格的时间线：所有订阅合并为一条 trace，
+    # 每个订阅占 3 个点（底部、顶部、None 断开），画出各自独立的竖线
+    n = len(_future_df)
+    names = _future_df['名称'].to_numpy(dtype=object)
+    amount_text = np.char.mod('%.2f', _future_df['金额'].to_numpy(dtype=np.float64))
+    auto = _future_df['自动续费'].to_numpy(dtype=bool)
+    
+    x = np.empty(n * 3, dtype=object)
+    x[0::3] = x[1::3] = _future_df['下次付费时间'].to_numpy(dtype=object)
+    y = np.tile(np.array([0, 1, None], dtype=object), n)
+    
+    text = np.full(n * 3, '', dtype=object)
+    text[0::3] = names
+    text[1::3] = currency_symbol + amount_text.astype(object)
+    
+    customdata = np.repeat(np.column_stack([
+        names,
+        _future_df['下次付费时间'].dt.strftime('%Y-%m-%d').to_numpy(dtype=object),
+        amount_text.astype(object),
+        _future_df['剩余天数'].to_numpy(dtype=object),
+        np.where(auto, '是', '否').astype(object),
+    ]), 3, axis=0)
+    
+    fig = go.Figure(go.Scatter(
+        x=x,
+        y=y,
+        mode='lines+markers+text',
+        text=text,
+        textposition='top center',
+        marker=dict(
+            size=15,
+            color=np.repeat(np.where(auto, 'red', 'blue'), 3),
+            symbol='circle'
+        ),
+        line=dict(width=2),
+        customdata=customdata,
+        hovertemplate="<b>%{customdata[0]}</b><br>" +
+                      "日期: %{customdata[1]}<br>" +
+                      "金额: " + currency_symbol + "%{customdata[2]}<br>" +
+                      "剩余: %{customdata[3]} 天<br>" +
+                      "自动续费: %{customdata[4]}<extra></extra>"
+    ))
     
     fig.update_layout(
         title='未来付费时间线',
@@ -311,7 +412,21 @@ def render_timeline_chart(df: pd.DataFrame):
         yaxis=dict(visible=False)
     )
     
-    st.plotly_chart(fig, width="stretch")
+    return fig.to_plotly_json()
+
+
+def render_timeline_chart(df: pd.DataFrame):
+    """渲染时间轴图表"""
+    st.markdown("### 📅 付费时间线")
+    
+    # 筛选未来的付费事件（有序时二分切片，否则按掩码筛选）
+    future_df = df.iloc[remaining_days_slice(df, 0, np.inf)]
+    
+    if future_df.empty:
+        st.info("📭 未来 90 天内无到期订阅")
+        return
+    
+    st.plotly_chart(_timeline_figure(session_fingerprint(df), CURRENCY_SYMBOL, future_df), width="stretch")
     
     # 图例说明
     col1, col2 = st.columns(2)
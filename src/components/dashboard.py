@@ -3,11 +3,83 @@
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 
 from ..config import WARNING_DAYS, CURRENCY_SYMBOL
 from ..utils.exporter import render_export_buttons
 from ..utils.currency import render_rate_status
+from ..utils.data_loader import session_fingerprint, remaining_days_slice
+
+
+def _bincount_by(column: pd.Series, weights: np.ndarray | None = None) -> list[tuple]:
+    """
+    基于分类编码的分组计数/求和（np.bincount），按结果降序排列
+
+    Args:
+        column: 分组列（category 列直接复用其编码）
+        weights: 求和权重；为 None 时计数
+
+    Returns:
+        list[tuple]: [(类别, 合计或数量), ...]，仅包含实际出现的类别
+    """
+    cat = pd.Categorical(column)
+    codes = cat.codes
+    valid = codes >= 0
+    n = len(cat.categories)
+    counts = np.bincount(codes[valid], minlength=n)
+    values = counts if weights is None else np.bincount(codes[valid], weights=weights[valid], minlength=n)
+    order = np.argsort(-values, kind='stable')
+    order = order[counts[order] > 0]
+    return list(zip(cat.categories[order].tolist(), values[order].tolist()))
+
+
+def _row_count(rows: slice | np.ndarray) -> int:
+    """remaining_days_slice 返回的行区间或行位置数组所含行数"""
+    return rows.stop - rows.start if isinstance(rows, slice) else len(rows)
+
+
+@st.cache_data(show_spinner=False)
+def _dashboard_stats(df_hash: str, _df: pd.DataFrame) -> dict:
+    """
+    计算仪表盘所需的聚合统计（按数据指纹缓存，数据不变时重跑直接命中）
+
+    Args:
+        df_hash: 数据框指纹（缓存键）
+        _df: 订阅数据框（不参与哈希）
+
+    Returns:
+        dict: 各项统计结果
+    """
+    # 数据已按下次付费时间排序时二分切片，否则由 remaining_days_slice 退回布尔掩码
+    active_rows = remaining_days_slice(_df, 0, np.inf)
+    upcoming_rows = remaining_days_slice(_df, 0, WARNING_DAYS)
+    # 与 pandas 的 sum 保持一致：缺失成本按 0 计
+    cost = np.nan_to_num(_df['月均成本'].to_numpy(dtype=np.float64))
+    # 供应商 Top 3：一次 groupby 同时得到支出合计与订阅数量（忽略空供应商）
+    supplier = _df['供应商']
+    supplier_stats = (
+        _df[supplier.notna() & (supplier != '')]
+        .groupby('供应商')['月均成本']
+        .agg(成本='sum', 数量='size')
+        .sort_values('成本', ascending=False)
+        .head(3)
+    )
+    return {
+        'total_count': len(_df),
+        'active_count': _row_count(active_rows),
+        'upcoming_rows': upcoming_rows,
+        'upcoming_count': _row_count(upcoming_rows),
+        'monthly_total': float(cost.sum()),
+        'category_stats': _bincount_by(_df['服务性质'], cost),
+        'cycle_stats': _bincount_by(_df['订阅类型']),
+        'top3': _df.nlargest(3, '月均成本')[['名称', '服务性质', '月均成本']],
+        'supplier_stats': list(zip(
+            supplier_stats.index.tolist(),
+            supplier_stats['成本'].tolist(),
+            supplier_stats['数量'].tolist()
+        )),
+    }
 
 
 def render_dashboard(df: pd.DataFrame):
@@ -29,31 +101,61 @@ def render_dashboard(df: pd.DataFrame):
     
     st.markdown("---")
     
+    # 聚合统计（按数据指纹缓存）
+    stats = _dashboard_stats(session_fingerprint(df), df)
+    
     # 红绿灯预警区
-    render_warning_banner(df)
+    render_warning_banner(df, stats['upcoming_rows'])
     
     # KPI 指标卡片
-    render_kpi_cards(df)
+    render_kpi_cards(stats)
     
     # 快速统计
-    render_quick_stats(df)
+    render_quick_stats(df, stats)
     
     # 导出报告
     st.markdown("---")
     render_export_buttons(df)
 
 
-def render_warning_banner(df: pd.DataFrame):
-    """渲染到期预警横幅（移动端优化）"""
+def _format_upcoming(rows: pd.DataFrame) -> str:
+    """
+    将即将到期的订阅拼接为一段 markdown（按列取值，不逐行构造 Series）
+    
+    Args:
+        rows: 即将到期的订阅
+        
+    Returns:
+        str: 每个订阅占一段的 markdown 文本
+    """
+    amounts = np.char.mod('%.2f', rows['金额'].to_numpy(dtype=np.float64))
+    return "\n\n".join(
+        # 移动端优化：使用更紧凑的布局
+        f"**{name}** ({category})  \n⏰ {days} 天后 | 💰 {CURRENCY_SYMBOL}{amount}"
+        for name, category, days, amount in zip(
+            rows['名称'].tolist(),
+            rows['服务性质'].tolist(),
+            rows['剩余天数'].tolist(),
+            amounts.tolist()
+        )
+    )
+
+
+def render_warning_banner(df: pd.DataFrame, upcoming_rows: slice | np.ndarray):
+    """
+    渲染到期预警横幅（移动端优化）
+    
+    Args:
+        df: 订阅数据框
+        upcoming_rows: 即将到期（0 ~ WARNING_DAYS 天）的行位置，与 KPI 卡片共用
+    """
     # 筛选所有即将到期的订阅（包括自动续费和手动续费）
-    upcoming = df[
-        (df['剩余天数'] <= WARNING_DAYS) & 
-        (df['剩余天数'] >= 0)
-    ]
+    upcoming = df.iloc[upcoming_rows]
     
     # 分类
-    auto_renew = upcoming[upcoming['自动续费'] == True]
-    manual_renew = upcoming[upcoming['自动续费'] != True]
+    auto_mask = upcoming['自动续费'].to_numpy(dtype=bool)
+    auto_renew = upcoming[auto_mask]
+    manual_renew = upcoming[~auto_mask]
     
     if not upcoming.empty:
         # 构建警告消息
@@ -71,35 +173,25 @@ def render_warning_banner(df: pd.DataFrame):
             # 自动续费部分
             if not auto_renew.empty:
                 st.markdown("**🔄 自动续费** - 以下订阅将自动扣款：")
-                for _, row in auto_renew.iterrows():
-                    # 移动端优化：使用更紧凑的布局
-                    st.markdown(f"""
-                    **{row['名称']}** ({row['服务性质']})  
-                    ⏰ {row['剩余天数']} 天后 | 💰 {CURRENCY_SYMBOL}{row['金额']:.2f}
-                    """)
+                st.markdown(_format_upcoming(auto_renew))
                 st.markdown("")
             
             # 手动续费部分
             if not manual_renew.empty:
                 st.markdown("**⚠️ 需手动续期** - 以下订阅如不续费将过期：")
-                for _, row in manual_renew.iterrows():
-                    # 移动端优化：使用更紧凑的布局
-                    st.markdown(f"""
-                    **{row['名称']}** ({row['服务性质']})  
-                    ⏰ {row['剩余天数']} 天后 | 💰 {CURRENCY_SYMBOL}{row['金额']:.2f}
-                    """)
+                st.markdown(_format_upcoming(manual_renew))
     else:
         st.success("✅ 近期无需关注的到期订阅")
 
 
-def render_kpi_cards(df: pd.DataFrame):
+def render_kpi_cards(stats: dict):
     """渲染 KPI 指标卡片"""
     col1, col2, col3, col4 = st.columns(4)
     
     # 订阅总数
     with col1:
-        total_count = len(df)
-        active_count = len(df[df['剩余天数'] >= 0])
+        total_count = stats['total_count']
+        active_count = stats['active_count']
         st.metric(
             label="📚 订阅总数",
             value=f"{total_count} 个",
@@ -108,7 +200,7 @@ def render_kpi_cards(df: pd.DataFrame):
     
     # 月均总支出
     with col2:
-        monthly_total = df['月均成本'].sum()
+        monthly_total = stats['monthly_total']
         st.metric(
             label="💰 月均总支出",
             value=f"{CURRENCY_SYMBOL}{monthly_total:.2f}",
@@ -126,10 +218,7 @@ def render_kpi_cards(df: pd.DataFrame):
     
     # 近期预警
     with col4:
-        upcoming_count = len(df[
-            (df['剩余天数'] <= WARNING_DAYS) & 
-            (df['剩余天数'] >= 0)
-        ])
+        upcoming_count = stats['upcoming_count']
         st.metric(
             label="⚠️ 近期预警",
             value=f"{upcoming_count} 个",
@@ -137,7 +226,7 @@ def render_kpi_cards(df: pd.DataFrame):
         )
 
 
-def render_quick_stats(df: pd.DataFrame):
+def render_quick_stats(df: pd.DataFrame, stats: dict):
     """渲染快速统计信息"""
     st.markdown("### 📈 快速统计")
     
@@ -145,19 +234,20 @@ def render_quick_stats(df: pd.DataFrame):
     
     with col1:
         st.markdown("#### 💸 按服务类型支出")
-        category_stats = df.groupby('服务性质')['月均成本'].sum().sort_values(ascending=False)
-        
-        for category, cost in category_stats.items():
-            percentage = (cost / df['月均成本'].sum()) * 100
-            st.write(f"**{category}**: {CURRENCY_SYMBOL}{cost:.2f} ({percentage:.1f}%)")
+        monthly_total = stats['monthly_total']
+        # 全部为终身或零成本订阅时月度总额为 0，占比按 0 显示
+        st.markdown("\n\n".join(
+            f"**{category}**: {CURRENCY_SYMBOL}{cost:.2f} ({cost / monthly_total * 100 if monthly_total else 0.0:.1f}%)"
+            for category, cost in stats['category_stats']
+        ))
     
     with col2:
         st.markdown("#### 🔄 按订阅类型分布")
-        cycle_stats = df['订阅类型'].value_counts()
-        
-        for cycle, count in cycle_stats.items():
-            percentage = (count / len(df)) * 100
-            st.write(f"**{cycle}**: {count} 个 ({percentage:.1f}%)")
+        total_count = stats['total_count']
+        st.markdown("\n\n".join(
+            f"**{cycle}**: {count} 个 ({count / total_count * 100:.1f}%)"
+            for cycle, count in stats['cycle_stats']
+        ))
     
     st.markdown("---")
     
@@ -167,7 +257,7 @@ def render_quick_stats(df: pd.DataFrame):
     with col1:
         # 最贵的 3 个订阅
         st.markdown("#### 💎 最贵的订阅")
-        top3 = df.nlargest(3, '月均成本')[['名称', '服务性质', '月均成本']]
+        top3 = stats['top3']
         
         for idx, row in top3.iterrows():
             st.write(f"🏆 **{row['名称']}** ({row['服务性质']}) - {CURRENCY_SYMBOL}{row['月均成本']:.2f}/月")
@@ -176,15 +266,8 @@ def render_quick_stats(df: pd.DataFrame):
         # 供应商渠道统计 - Top 3
         st.markdown("#### 🏪 渠道统计（按供应商）")
         
-        # 过滤掉空的供应商
-        df_with_supplier = df[df['供应商'].notna() & (df['供应商'] != '')]
-        
-        if not df_with_supplier.empty:
-            supplier_stats = df_with_supplier.groupby('供应商')['月均成本'].sum().sort_values(ascending=False)
-            top3_suppliers = supplier_stats.head(3)
-            
-            for supplier, cost in top3_suppliers.items():
-                count = len(df_with_supplier[df_with_supplier['供应商'] == supplier])
+        if stats['supplier_stats']:
+            for supplier, cost, count in stats['supplier_stats']:
                 st.write(f"🏢 **{supplier}**: {CURRENCY_SYMBOL}{cost:.2f}/月（{count} 个订阅）")
         else:
             st.info("暂无供应商数据")
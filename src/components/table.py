@@ -3,10 +3,32 @@
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime
 
 from ..utils import delete_subscription, update_subscription, load_service_types, load_subscribe_types
-from ..utils.currency import get_currency_symbol
+from ..utils.currency import CURRENCY_SYMBOLS, get_currency_symbol
+from ..utils.data_loader import session_fingerprint
+
+
+# 货币代码 -> 符号映射（导入时构建一次，供列级向量化格式化使用）
+_SYMBOL_TABLE = {code: get_currency_symbol(code) for code in CURRENCY_SYMBOLS}
+
+# 续费状态筛选选项（模块级常量，避免每次重跑重建）
+_RENEWAL_OPTIONS = {
+    '全部': None,
+    '自动续费': True,
+    '不续费': False
+}
+
+# 排序选项：显示文本 -> (排序列, 是否升序)
+_SORT_OPTIONS = {
+    '剩余天数（升序）': ('剩余天数', True),
+    '剩余天数（降序）': ('剩余天数', False),
+    '月均成本（升序）': ('月均成本', True),
+    '月均成本（降序）': ('月均成本', False),
+    '名称（A-Z）': ('名称', True),
+}
 
 
 def render_subscription_table(df: pd.DataFrame):
@@ -96,65 +118,97 @@ def render_filters(df: pd.DataFrame):
     
     with col2:
         # 续费状态筛选
-        renewal_options = {
-            '全部': None,
-            '自动续费': True,
-            '不续费': False
-        }
-        selected_renewal = st.selectbox("🔄 续费状态", list(renewal_options.keys()))
-        st.session_state['filter_renewal'] = renewal_options[selected_renewal]
+        selected_renewal = st.selectbox("🔄 续费状态", tuple(_RENEWAL_OPTIONS))
+        st.session_state['filter_renewal'] = _RENEWAL_OPTIONS[selected_renewal]
     
     with col3:
         # 排序选项
-        sort_options = {
-            '剩余天数（升序）': ('剩余天数', True),
-            '剩余天数（降序）': ('剩余天数', False),
-            '月均成本（升序）': ('月均成本', True),
-            '月均成本（降序）': ('月均成本', False),
-            '名称（A-Z）': ('名称', True),
-        }
-        selected_sort = st.selectbox("🔢 排序方式", list(sort_options.keys()))
-        st.session_state['sort_by'], st.session_state['sort_asc'] = sort_options[selected_sort]
+        selected_sort = st.selectbox("🔢 排序方式", tuple(_SORT_OPTIONS))
+        st.session_state['sort_by'], st.session_state['sort_asc'] = _SORT_OPTIONS[selected_sort]
 
 
-def prepare_display_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+@st.cache_data(show_spinner=False)
+def _filtered_sorted_index(
+    df_hash: str,
+    filter_category,
+    filter_renewal,
+    sort_by,
+    sort_asc: bool,
+    _df: pd.DataFrame
+) -> np.ndarray:
     """
-    准备用于显示的数据框
+    计算筛选和排序后的行位置（按数据指纹与筛选条件缓存）
     
     Args:
-        df: 原始数据框
+        df_hash: 数据框指纹（缓存键）
+        filter_category: 服务类型筛选
+        filter_renewal: 续费状态筛选
+        sort_by: 排序列
+        sort_asc: 是否升序
+        _df: 原始数据框（不参与哈希）
         
     Returns:
-        pd.DataFrame: 处理后的数据框
+        np.ndarray: 行位置数组
     """
-    display_df = df.copy()
+    mask = np.ones(len(_df), dtype=bool)
+    if filter_category:
+        mask &= (_df['服务性质'] == filter_category).to_numpy()
+    if filter_renewal is not None:
+        mask &= (_df['自动续费'] == filter_renewal).to_numpy()
+    positions = np.flatnonzero(mask)
     
-    # 应用筛选
-    if st.session_state.get('filter_category'):
-        display_df = display_df[display_df['服务性质'] == st.session_state['filter_category']]
+    if sort_by:
+        keys = pd.Series(_df[sort_by].to_numpy()[positions], index=positions)
+        positions = keys.sort_values(ascending=sort_asc, kind='stable').index.to_numpy()
     
-    if st.session_state.get('filter_renewal') is not None:
-        display_df = display_df[display_df['自动续费'] == st.session_state['filter_renewal']]
+    return positions
+
+
+@st.cache_data(show_spinner=False)
+def _name_lookup(df_hash: str, _df: pd.DataFrame) -> tuple[list, dict]:
+    """
+    构建订阅名称列表及「名称 -> 行索引」映射（按数据指纹缓存）
     
-    # 应用排序
-    if st.session_state.get('sort_by'):
-        display_df = display_df.sort_values(
-            by=st.session_state['sort_by'],
-            ascending=st.session_state.get('sort_asc', True)
-        )
+    Args:
+        df_hash: 数据框指纹，作为缓存键
+        _df: 原始数据框（不参与哈希）
+        
+    Returns:
+        tuple: (名称列表, 名称到行索引的映射；重名时取第一条)
+    """
+    names = _df['名称'].tolist()
+    name_to_index = {}
+    for name, index in zip(names, _df.index.tolist()):
+        name_to_index.setdefault(name, index)
+    return names, name_to_index
+
+
+def prepare_display_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    准备用于显示的数据框
     
-    # 格式化金额列，使用每条订阅实际的货币符号
-    def format_amount_with_currency(row, amount_col):
-        currency = row.get('货币', 'THB') if pd.notna(row.get('货币')) else 'THB'
-        symbol = get_currency_symbol(currency)
-        return f"{symbol}{row[amount_col]:.2f}"
+    Args:
+        df: 原始数据框
+        
+    Returns:
+        pd.DataFrame: 处理后的数据框
+    """
+    # 一次性读取筛选/排序状态到局部变量
+    state = st.session_state
+    filter_category = state.get('filter_category')
+    filter_renewal = state.get('filter_renewal')
+    sort_by = state.get('sort_by')
+    sort_asc = state.get('sort_asc', True)
     
-    display_df['金额'] = display_df.apply(
-        lambda row: format_amount_with_currency(row, '金额'), axis=1
-    )
-    display_df['月均成本'] = display_df.apply(
-        lambda row: format_amount_with_currency(row, '月均成本'), axis=1
+    positions = _filtered_sorted_index(
+        session_fingerprint(df),
+        filter_category,
+        filter_renewal,
+        sort_by,
+        sort_asc,
+        df
     )
+    view = df.iloc[positions]
     
     # 选择要显示的列
     display_columns = [
@@ -168,15 +222,28 @@ def prepare_display_dataframe(df: pd.DataFrame) -> pd.DataFrame:
         '自动续费'
     ]
     
-    return display_df[display_columns]
+    # 格式化金额列，使用每条订阅实际的货币符号（未知货币显示代码本身）
+    # category 列的 map 只对各类别计算一次
+    symbols = (
+        view['货币']
+        .map(lambda code: _SYMBOL_TABLE.get(code, code))
+        .astype(object)
+        .fillna(_SYMBOL_TABLE['THB'])
+        .to_numpy(dtype=object)
+    )
+    
+    return view[display_columns].assign(**{
+        '金额': symbols + np.char.mod('%.2f', view['金额'].to_numpy(dtype=np.float64)),
+        '月均成本': symbols + np.char.mod('%.2f', view['月均成本'].to_numpy(dtype=np.float64)),
+    })
 
 
 def render_edit_section(df: pd.DataFrame):
     """渲染编辑订阅区域"""
-    from ..utils.currency import SUPPORTED_CURRENCIES, get_currency_symbol
+    from ..utils.currency import CURRENCY_OPTIONS, SUPPORTED_CURRENCIES, get_currency_symbol
     
     # 选择要编辑的订阅
-    subscription_names = df['名称'].tolist()
+    subscription_names, name_to_index = _name_lookup(session_fingerprint(df), df)
     selected_name = st.selectbox(
         "选择要编辑的订阅",
         subscription_names,
@@ -185,7 +252,7 @@ def render_edit_section(df: pd.DataFrame):
     
     if selected_name:
         # 获取当前选中订阅的数据
-        index = df[df['名称'] == selected_name].index[0]
+        index = name_to_index[selected_name]
         current_data = df.loc[index]
         
         # 使用动态 key，确保每次选择变化时表单完全重建
@@ -217,10 +284,10 @@ def render_edit_section(df: pd.DataFrame):
                 
                 # 货币选择
                 current_currency = current_data.get('货币', 'THB') if pd.notna(current_data.get('货币', 'THB')) else 'THB'
-                current_currency_idx = SUPPORTED_CURRENCIES.index(current_currency) if current_currency in SUPPORTED_CURRENCIES else 0
+                current_currency_idx = CURRENCY_OPTIONS.index(current_currency) if current_currency in SUPPORTED_CURRENCIES else 0
                 new_currency = st.selectbox(
                     "货币",
-                    SUPPORTED_CURRENCIES,
+                    CURRENCY_OPTIONS,
                     index=current_currency_idx
                 )
             
@@ -268,7 +335,7 @@ def render_edit_section(df: pd.DataFrame):
                     '自动续费': new_auto_renew
                 }
                 
-                if update_subscription(index, updated_data):
+                if update_subscription(index, updated_data, df):
                     st.success(f"✅ 成功更新订阅: {new_name}")
                     st.rerun()
                 else:
@@ -281,7 +348,7 @@ def render_delete_section(df: pd.DataFrame):
     
     with col1:
         # 选择要删除的订阅
-        subscription_names = df['名称'].tolist()
+        subscription_names, name_to_index = _name_lookup(session_fingerprint(df), df)
         selected_name = st.selectbox(
             "选择要删除的订阅",
             subscription_names,
@@ -293,7 +360,7 @@ def render_delete_section(df: pd.DataFrame):
         st.write("")  # 占位符对齐
         if st.button("🗑️ 删除", type="secondary", key="delete_btn"):
             # 获取索引
-            index = df[df['名称'] == selected_name].index[0]
+            index = name_to_index[selected_name]
             
             # 确认删除
             if st.session_state.get('confirm_delete') != selected_name:
@@ -301,7 +368,7 @@ def render_delete_section(df: pd.DataFrame):
                 st.warning(f"⚠️ 确定要删除 **{selected_name}** 吗？再次点击确认删除。")
             else:
                 # 执行删除
-                if delete_subscription(index):
+                if delete_subscription(index, df):
                     st.success(f"✅ 已删除 **{selected_name}**")
                     st.session_state['confirm_delete'] = None
                     st.rerun()
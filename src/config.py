@@ -24,6 +24,9 @@ DATE_FORMAT = "%Y-%m-%d"
 # 预警天数（距离下次付费少于此天数时发出预警）
 WARNING_DAYS = 7
 
+# 邮件提醒的默认预警天数（remind.py）
+REMINDER_DAYS = 3
+
 # 页面配置
 PAGE_TITLE = "MySub Manager"
 PAGE_ICON = "📊"
@@ -66,6 +69,13 @@ REQUIRED_COLUMNS = [
     "自动续费"
 ]
 
+# 低基数文本列，加载时转为 category 类型
+CATEGORY_COLUMNS = [
+    "服务性质",
+    "订阅类型",
+    "货币"
+]
+
 # 默认币种（泰铢）
 DEFAULT_CURRENCY = "THB"
 CURRENCY_SYMBOL = "฿"
@@ -2,6 +2,7 @@
 MySub Manager - 主应用入口
 """
 import streamlit as st
+import pandas as pd
 import sys
 from pathlib import Path
 
@@ -15,6 +16,7 @@ from src.utils import (
     load_subscribe_types,
     add_subscription
 )
+from src.utils.data_loader import dataframe_fingerprint
 from src.utils.responsive import inject_responsive_css
 from src.components import (
     render_dashboard,
@@ -25,6 +27,10 @@ from src.components import (
 
 def main():
     """主函数"""
+    # 在应用入口启用写时复制（切片即视图），不作为导入副作用影响其他导入方；
+    # 各组件不依赖该选项：只读取数据或构建新数据框，不原地修改切片
+    pd.set_option('mode.copy_on_write', True)
+    
     # 页面配置
     st.set_page_config(**STREAMLIT_CONFIG)
     
@@ -44,11 +50,13 @@ def main():
     </style>
     """, unsafe_allow_html=True)
     
-    # 侧边栏 - 导航和新增功能
-    render_sidebar()
-    
-    # 加载数据
+    # 加载数据（每次重跑只加载一次，供侧边栏与页面共用）
     df = load_subscriptions()
+    # 数据指纹每次重跑只计算一次，各组件的缓存键直接复用（连同数据框 id 一起记录）
+    st.session_state['df_fp'] = (id(df), dataframe_fingerprint(df))
+    
+    # 侧边栏 - 导航和新增功能
+    render_sidebar(df)
     
     # 根据选择的页面渲染内容
     page = st.session_state.get('page', '仪表盘')
@@ -61,7 +69,7 @@ def main():
         render_analytics(df)
 
 
-def render_sidebar():
+def render_sidebar(df: pd.DataFrame):
     """渲染侧边栏"""
     with st.sidebar:
         st.title("📊 MySub Manager")
@@ -83,12 +91,12 @@ def render_sidebar():
         st.markdown("---")
         
         # 数据管理功能
-        render_data_management()
+        render_data_management(df)
         
         st.markdown("---")
         
         # 新增订阅表单
-        render_add_form()
+        render_add_form(df)
         
         st.markdown("---")
         
@@ -103,7 +111,6 @@ def render_sidebar():
         """)
         
         # 数据统计
-        df = load_subscriptions()
         if not df.empty:
             total_monthly = df['月均成本'].sum()
             st.markdown(f"""
@@ -113,7 +120,7 @@ def render_sidebar():
             """)
 
 
-def render_data_management():
+def render_data_management(df: pd.DataFrame):
     """渲染数据管理功能（导入/导出）"""
     from src.utils.importer import render_import_section
     from src.utils.exporter import render_export_buttons
@@ -127,16 +134,15 @@ def render_data_management():
         render_import_section()
     
     with tab2:
-        df = load_subscriptions()
         if not df.empty:
             render_export_buttons(df)
         else:
             st.info("📭 暂无数据可导出")
 
 
-def render_add_form():
+def render_add_form(df: pd.DataFrame):
     """渲染新增订阅表单"""
-    from src.utils.currency import SUPPORTED_CURRENCIES, get_currency_symbol
+    from src.utils.currency import CURRENCY_OPTIONS, get_currency_symbol
     
     st.markdown("### ➕ 添加订阅")
     
@@ -169,7 +175,7 @@ def render_add_form():
             # 货币选择
             currency = st.selectbox(
                 "货币",
-                SUPPORTED_CURRENCIES,
+                CURRENCY_OPTIONS,
                 index=0  # 默认 THB
             )
         
@@ -202,7 +208,7 @@ def render_add_form():
                 }
                 
                 # 添加订阅
-                if add_subscription(new_subscription):
+                if add_subscription(new_subscription, df):
                     st.success(f"✅ 成功添加订阅: {name}")
                     st.rerun()
                 else:
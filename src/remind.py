@@ -22,13 +22,8 @@ from pathlib import Path
 # 添加项目根目录到 Python 路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.config import CURRENCY_SYMBOL
-from src.utils.notifications import (
-    get_upcoming_subscriptions,
-    format_reminder_message,
-    check_and_remind,
-    DEFAULT_WARNING_DAYS
-)
+# 仅导入轻量配置；pandas/streamlit 相关模块在参数解析后再导入，--help 可立即返回
+from src.config import CURRENCY_SYMBOL, REMINDER_DAYS
 
 
 def main():
@@ -49,8 +44,8 @@ def main():
     parser.add_argument(
         '--days', '-d',
         type=int,
-        default=DEFAULT_WARNING_DAYS,
-        help=f'提前预警天数（默认: {DEFAULT_WARNING_DAYS}）'
+        default=REMINDER_DAYS,
+        help=f'提前预警天数（默认: {REMINDER_DAYS}）'
     )
     
     parser.add_argument(
@@ -74,6 +69,12 @@ def main():
     
     args = parser.parse_args()
     
+    from src.utils.notifications import (
+        get_upcoming_subscriptions,
+        format_reminder_message,
+        check_and_remind
+    )
+    
     print("=" * 50)
     print("📊 MySub Manager - 订阅到期提醒")
     print("=" * 50)
@@ -82,26 +83,9 @@ def main():
     # 加载订阅数据
     print("📂 加载订阅数据...")
     try:
-        import pandas as pd
-        from src.config import SUBSCRIPTIONS_FILE, CSV_ENCODING
-        from src.utils.data_loader import apply_auto_renewals, save_subscriptions_core
-
-        df = pd.read_csv(SUBSCRIPTIONS_FILE, encoding=CSV_ENCODING)
-        df['下次付费时间'] = pd.to_datetime(df['下次付费时间'])
-        df['金额'] = pd.to_numeric(df['金额'], errors='coerce')
-        df['自动续费'] = df['自动续费'].map({'TRUE': True, 'FALSE': False, True: True, False: False})
-        df['剩余天数'] = (df['下次付费时间'] - pd.Timestamp.now()).dt.days
-
-        # 对已过期且自动续费的订阅，按周期推进「下次付费时间」并写回
-        df, changed = apply_auto_renewals(df)
-        if changed:
-            df['剩余天数'] = (df['下次付费时间'] - pd.Timestamp.now()).dt.days
-            try:
-                save_subscriptions_core(df)
-                print("   🔄 已对到期的自动续费订阅更新下次付费时间并写回")
-            except Exception as e:
-                print(f"   ⚠️ 自动续期后保存失败: {e}")
+        from src.utils.reminder_loader import load_for_reminder
 
+        df = load_for_reminder()
         print(f"   ✅ 已加载 {len(df)} 条订阅记录")
     except Exception as e:
         print(f"   ❌ 加载失败: {e}")
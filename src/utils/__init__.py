@@ -1,40 +1,53 @@
 """
 工具函数包
 """
-from .data_loader import (
-    load_subscriptions,
-    load_service_types,
-    load_subscribe_types,
-    save_subscriptions,
-    add_subscription,
-    delete_subscription,
-    update_subscription,
-    calculate_monthly_cost
-)
-from .validator import (
-    ValidationError,
-    validate_subscription_data,
-    validate_date,
-    validate_amount,
-    validate_service_type,
-    validate_subscribe_type,
-    validate_dataframe,
-    sanitize_string
-)
-from .currency import (
-    SUPPORTED_CURRENCIES,
-    CURRENCY_SYMBOLS,
-    convert_to_thb,
-    convert_from_thb,
-    get_currency_symbol,
-    format_currency,
-    get_exchange_rate,
-    get_exchange_rates,
-    get_all_rates,
-    get_rate_info,
-    get_rate_status,
-    render_rate_status
-)
+import importlib
+
+# 按需导入：访问某个名称时才导入其所在模块，避免 CLI 场景加载 streamlit/pandas
+_EXPORTS = {
+    'data_loader': (
+        'load_subscriptions',
+        'load_service_types',
+        'load_subscribe_types',
+        'save_subscriptions',
+        'add_subscription',
+        'add_subscriptions',
+        'delete_subscription',
+        'update_subscription',
+        'calculate_monthly_cost',
+        'calculate_monthly_costs',
+    ),
+    'validator': (
+        'ValidationError',
+        'validate_subscription_data',
+        'validate_subscription_frame',
+        'validate_date',
+        'validate_date_array',
+        'validate_amount',
+        'validate_amount_array',
+        'validate_service_type',
+        'validate_subscribe_type',
+        'validate_dataframe',
+        'sanitize_string',
+        'sanitize_string_array',
+    ),
+    'currency': (
+        'SUPPORTED_CURRENCIES',
+        'CURRENCY_OPTIONS',
+        'CURRENCY_SYMBOLS',
+        'convert_to_thb',
+        'convert_from_thb',
+        'get_currency_symbol',
+        'format_currency',
+        'get_exchange_rate',
+        'get_exchange_rates',
+        'get_all_rates',
+        'get_rate_info',
+        'get_rate_status',
+        'render_rate_status',
+    ),
+}
+_NAME_TO_MODULE = {name: module for module, names in _EXPORTS.items() for name in names}
 
 __all__ = [
     # data_loader
@@ -43,20 +56,27 @@ __all__ = [
     'load_subscribe_types',
     'save_subscriptions',
     'add_subscription',
+    'add_subscriptions',
     'delete_subscription',
     'update_subscription',
     'calculate_monthly_cost',
+    'calculate_monthly_costs',
     # validator
     'ValidationError',
     'validate_subscription_data',
+    'validate_subscription_frame',
     'validate_date',
+    'validate_date_array',
     'validate_amount',
+    'validate_amount_array',
     'validate_service_type',
     'validate_subscribe_type',
     'validate_dataframe',
     'sanitize_string',
+    'sanitize_string_array',
     # currency
     'SUPPORTED_CURRENCIES',
+    'CURRENCY_OPTIONS',
     'CURRENCY_SYMBOLS',
     'convert_to_thb',
     'convert_from_thb',
@@ -71,3 +91,14 @@ __all__ = [
 ]
 
 
+def __getattr__(name):
+    module = _NAME_TO_MODULE.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -5,20 +5,18 @@
 import http.client
 import json
 import os
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal, ROUND_HALF_UP
 from pathlib import Path
 from typing import Optional
-import pandas as pd
-from dotenv import load_dotenv
+import numpy as np
 
-# 加载环境变量
-load_dotenv()
-
-# BOT API 配置（从环境变量读取）
+# BOT API 配置（从环境变量读取；.env 在首次调用 API 前才加载）
 BOT_API_HOST = "gateway.api.bot.or.th"
 BOT_API_PATH = "/Stat-ExchangeRate/v2/DAILY_AVG_EXG_RATE/"
 BOT_API_TOKEN = os.getenv('BOT_API_TOKEN', '')
+_env_loaded = False
 
 # 数据目录
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
@@ -29,11 +27,13 @@ CSV_ENCODING = "utf-8-sig"
 CACHE_TTL_SECONDS = 3600  # 1 小时
 
 # 支持的货币类型（BOT API 支持的货币）
-SUPPORTED_CURRENCIES = [
+CURRENCY_OPTIONS = (
     'THB', 'USD', 'EUR', 'GBP', 'JPY', 'CNY', 'HKD', 'SGD',
     'AUD', 'NZD', 'CHF', 'CAD', 'MYR', 'KRW', 'INR', 'TWD',
     'SAR', 'AED', 'DKK', 'SEK', 'NOK'
-]
+)
+# 成员判断用集合；下拉框等需要顺序的场景用 CURRENCY_OPTIONS（THB 在首位作为默认值）
+SUPPORTED_CURRENCIES = frozenset(CURRENCY_OPTIONS)
 
 # 货币符号映射
 CURRENCY_SYMBOLS = {
@@ -62,6 +62,9 @@ FALLBACK_RATES = {
     'INR': Decimal('0.43'),
 }
 
+# 备用汇率的 float 版本，供浮点换算直接使用
+_FALLBACK_FLOAT = {code: float(rate) for code, rate in FALLBACK_RATES.items()}
+
 # 汇率状态信息
 _rate_status = {
     'status': 'unknown',  # 'success', 'updating', 'error', 'cached', 'fallback'
@@ -70,6 +73,41 @@ _rate_status = {
     'source': 'unknown'
 }
 
+# 进程内汇率缓存：命中时不再重复读取、解析 CSV
+_rates_cache: Optional[dict[str, Decimal]] = None
+_rates_cache_mtime: int = 0
+_rates_cache_ts: float = 0.0
+
+# 与 _rates_cache 对应的 float 汇率表（含备用汇率），供换算热路径使用
+_rates_float: dict[str, float] = {}
+_rates_float_source: Optional[dict[str, Decimal]] = None
+
+
+def _rate_file_mtime() -> int:
+    """获取汇率 CSV 的修改时间（纳秒），文件不存在时返回 0"""
+    try:
+        return EXCHANGE_RATE_FILE.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _invalidate_rate_cache() -> None:
+    """清空进程内汇率缓存"""
+    global _rates_cache
+    _rates_cache = None
+
+
+def _ensure_env() -> None:
+    """首次需要时才加载 .env，避免导入模块时的文件 IO"""
+    global _env_loaded, BOT_API_TOKEN
+    if _env_loaded:
+        return
+    from dotenv import load_dotenv
+    load_dotenv()
+    _env_loaded = True
+    if not BOT_API_TOKEN:
+        BOT_API_TOKEN = os.getenv('BOT_API_TOKEN', '')
+
 
 def load_rates_from_csv() -> tuple[dict[str, Decimal], Optional[datetime]]:
     """
@@ -81,6 +119,8 @@ def load_rates_from_csv() -> tuple[dict[str, Decimal], Optional[datetime]]:
     if not EXCHANGE_RATE_FILE.exists():
         return {}, None
     
+    import pandas as pd
+    
     try:
         df = pd.read_csv(EXCHANGE_RATE_FILE, encoding=CSV_ENCODING)
         
@@ -92,11 +132,11 @@ def load_rates_from_csv() -> tuple[dict[str, Decimal], Optional[datetime]]:
         if 'updated_at' in df.columns and len(df) > 0:
             last_updated = pd.to_datetime(df['updated_at'].iloc[0])
         
-        # 构建汇率字典
+        # 构建汇率字典（按列取值，不逐行构造 Series）
         rates = {'THB': Decimal('1.0')}
-        for _, row in df.iterrows():
+        for currency, rate in zip(df['currency'].tolist(), df['rate'].tolist()):
             try:
-                rates[row['currency']] = Decimal(str(row['rate']))
+                rates[currency] = Decimal(str(rate))
             except:
                 pass
         
@@ -117,6 +157,8 @@ def save_rates_to_csv(rates: dict[str, Decimal]) -> bool:
     Returns:
         bool: 保存是否成功
     """
+    import pandas as pd
+    
     try:
         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
@@ -131,6 +173,7 @@ def save_rates_to_csv(rates: dict[str, Decimal]) -> bool:
         
         df = pd.DataFrame(data)
         df.to_csv(EXCHANGE_RATE_FILE, index=False, encoding=CSV_ENCODING)
+        _invalidate_rate_cache()
         return True
         
     except Exception as e:
@@ -150,6 +193,7 @@ def fetch_exchange_rates_from_bot(date: Optional[str] = None) -> dict[str, Decim
     """
     global _rate_status
     
+    _ensure_env()
     if not BOT_API_TOKEN:
         _rate_status['status'] = 'error'
         _rate_status['message'] = 'BOT_API_TOKEN 未配置，请在 .env 文件中设置'
@@ -158,14 +202,12 @@ def fetch_exchange_rates_from_bot(date: Optional[str] = None) -> dict[str, Decim
     _rate_status['status'] = 'updating'
     _rate_status['message'] = '正在从泰国央行获取汇率...'
     
-    # 如果没有指定日期，尝试最近 7 天（避免周末/假期无数据）
-    dates_to_try = []
+    # 如果没有指定日期，一次请求最近 7 天的区间（避免周末/假期无数据），取其中最新的汇率
     if date is None:
-        for days_ago in range(1, 8):
-            target = datetime.now() - timedelta(days=days_ago)
-            dates_to_try.append(target.strftime('%Y-%m-%d'))
+        start_period = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+        end_period = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
     else:
-        dates_to_try = [date]
+        start_period = end_period = date
     
     try:
         conn = http.client.HTTPSConnection(BOT_API_HOST, timeout=10)
@@ -175,50 +217,51 @@ def fetch_exchange_rates_from_bot(date: Optional[str] = None) -> dict[str, Decim
             'Authorization': BOT_API_TOKEN
         }
         
-        # 遍历日期列表，直到找到有效数据
-        for try_date in dates_to_try:
-            query = f"?start_period={try_date}&end_period={try_date}"
-            conn.request("GET", f"{BOT_API_PATH}{query}", headers=headers)
-            res = conn.getresponse()
-            
-            if res.status != 200:
-                _rate_status['status'] = 'error'
-                _rate_status['message'] = f'API 返回状态码: {res.status}'
-                return {}
-            
-            data = json.loads(res.read().decode('utf-8'))
-            
-            # 解析响应
-            rates = {'THB': Decimal('1.0')}
-            
-            result = data.get('result', {})
-            data_detail = result.get('data', {}).get('data_detail', [])
-            
-            if isinstance(data_detail, list):
-                for item in data_detail:
-                    currency_id = item.get('currency_id', '')
-                    mid_rate = item.get('mid_rate', '')
-                    
-                    if currency_id and mid_rate:
-                        try:
-                            rates[currency_id] = Decimal(mid_rate)
-                        except:
-                            pass
-            
-            # 如果获取到有效汇率，更新状态并返回
-            if len(rates) > 1:
-                _rate_status['status'] = 'success'
-                _rate_status['message'] = f'汇率更新成功（{try_date}），获取到 {len(rates)} 种货币'
-                _rate_status['last_updated'] = datetime.now()
-                _rate_status['source'] = 'Bank of Thailand API'
-                
-                # 保存到 CSV
-                save_rates_to_csv(rates)
-                conn.close()
-                return rates
+        query = f"?start_period={start_period}&end_period={end_period}"
+        conn.request("GET", f"{BOT_API_PATH}{query}", headers=headers)
+        res = conn.getresponse()
+        
+        if res.status != 200:
+            conn.close()
+            _rate_status['status'] = 'error'
+            _rate_status['message'] = f'API 返回状态码: {res.status}'
+            return {}
         
-        # 遍历所有日期都没有有效数据
+        data = json.loads(res.read().decode('utf-8'))
         conn.close()
+        
+        # 解析响应
+        rates = {'THB': Decimal('1.0')}
+        latest_period = ''
+        
+        result = data.get('result', {})
+        data_detail = result.get('data', {}).get('data_detail', [])
+        
+        if isinstance(data_detail, list):
+            # 按日期升序处理，同一货币以最新一天的汇率为准
+            for item in sorted(data_detail, key=lambda item: item.get('period', '')):
+                currency_id = item.get('currency_id', '')
+                mid_rate = item.get('mid_rate', '')
+                
+                if currency_id and mid_rate:
+                    try:
+                        rates[currency_id] = Decimal(mid_rate)
+                        latest_period = item.get('period', '') or latest_period
+                    except:
+                        pass
+        
+        # 如果获取到有效汇率，更新状态并返回
+        if len(rates) > 1:
+            _rate_status['status'] = 'success'
+            _rate_status['message'] = f'汇率更新成功（{latest_period or end_period}），获取到 {len(rates)} 种货币'
+            _rate_status['last_updated'] = datetime.now()
+            _rate_status['source'] = 'Bank of Thailand API'
+            
+            # 保存到 CSV
+            save_rates_to_csv(rates)
+            return rates
+        
+        # 区间内没有有效数据
         _rate_status['status'] = 'error'
         _rate_status['message'] = '未能获取有效汇率数据（可能为假期）'
         return {'THB': Decimal('1.0')}
@@ -236,6 +279,31 @@ def get_exchange_rates(force_refresh: bool = False) -> dict[str, Decimal]:
     Args:
         force_refresh: 是否强制从 API 刷新
         
+    Returns:
+        dict: 货币代码 -> THB 汇率的映射
+    """
+    global _rates_cache, _rates_cache_mtime, _rates_cache_ts
+    
+    # 进程内缓存：CSV 未变更且未超过有效期时直接返回
+    if not force_refresh and _rates_cache is not None:
+        if (_rate_file_mtime() == _rates_cache_mtime
+                and time.monotonic() - _rates_cache_ts < CACHE_TTL_SECONDS):
+            return _rates_cache
+    
+    rates = _resolve_exchange_rates(force_refresh)
+    _rates_cache = rates
+    _rates_cache_mtime = _rate_file_mtime()
+    _rates_cache_ts = time.monotonic()
+    return rates
+
+
+def _resolve_exchange_rates(force_refresh: bool) -> dict[str, Decimal]:
+    """
+    按「CSV 缓存 -> API -> 过期 CSV -> 备用汇率」的顺序获取汇率
+    
+    Args:
+        force_refresh: 是否跳过 CSV 缓存直接请求 API
+        
     Returns:
         dict: 货币代码 -> THB 汇率的映射
     """
@@ -277,6 +345,34 @@ def get_exchange_rates(force_refresh: bool = False) -> dict[str, Decimal]:
     return FALLBACK_RATES.copy()
 
 
+def get_float_rates() -> dict[str, float]:
+    """
+    获取 float 形式的汇率表（已合并备用汇率），随 get_exchange_rates 的缓存一同更新
+    
+    Returns:
+        dict: 货币代码 -> THB 汇率（float）
+    """
+    global _rates_float, _rates_float_source
+    
+    rates = get_exchange_rates()
+    if rates is not _rates_float_source:
+        _rates_float = _FALLBACK_FLOAT.copy()
+        _rates_float.update((code, float(rate)) for code, rate in rates.items())
+        _rates_float_source = rates
+    return _rates_float
+
+
+def round_half_up(value, decimals: int = 2):
+    """
+    按 ROUND_HALF_UP 舍入（浮点实现），支持标量与 numpy 数组
+    
+    先将放大后的值舍入到 6 位小数，消除乘法带来的二进制表示误差，
+    使 1.005 之类的值与 Decimal 的结果一致。
+    """
+    scale = 10 ** decimals
+    return np.floor(np.round(np.multiply(value, scale), 6) + 0.5) / scale
+
+
 def get_rate_status() -> dict:
     """
     获取汇率更新状态
@@ -293,14 +389,11 @@ def convert_to_thb(amount: float, currency: str) -> float:
     """
     if currency == 'THB':
         return amount
+    if amount == 0:
+        return 0.0
     
-    rates = get_exchange_rates()
-    rate = rates.get(currency, FALLBACK_RATES.get(currency, Decimal('1.0')))
-    
-    decimal_amount = Decimal(str(amount))
-    thb_amount = decimal_amount * rate
-    
-    return float(thb_amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+    rate = get_float_rates().get(currency, 1.0)
+    return float(round_half_up(amount * rate))
 
 
 def convert_from_thb(thb_amount: float, target_currency: str) -> float:
@@ -309,17 +402,15 @@ def convert_from_thb(thb_amount: float, target_currency: str) -> float:
     """
     if target_currency == 'THB':
         return thb_amount
+    if thb_amount == 0:
+        return 0.0
     
-    rates = get_exchange_rates()
-    rate = rates.get(target_currency, FALLBACK_RATES.get(target_currency, Decimal('1.0')))
+    rate = get_float_rates().get(target_currency, 1.0)
     
     if rate == 0:
         return 0.0
     
-    decimal_amount = Decimal(str(thb_amount))
-    converted_amount = decimal_amount / rate
-    
-    return float(converted_amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+    return float(round_half_up(thb_amount / rate))
 
 
 def get_currency_symbol(currency: str) -> str:
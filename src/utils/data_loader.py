@@ -1,6 +1,8 @@
 """
 数据加载和验证模块
 """
+import hashlib
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import Optional
@@ -11,7 +13,8 @@ from ..config import (
     SERVICE_FILE,
     SUBSCRIBE_TYPE_FILE,
     CSV_ENCODING,
-    REQUIRED_COLUMNS
+    REQUIRED_COLUMNS,
+    CATEGORY_COLUMNS
 )
 
 
@@ -28,7 +31,7 @@ def _add_period(dt: pd.Timestamp, cycle: str) -> pd.Timestamp | None:
     return None  # 终身或未知类型
 
 
-def apply_auto_renewals(df: pd.DataFrame) -> tuple[pd.DataFrame, bool]:
+def apply_auto_renewals(df: pd.DataFrame, now: Optional[pd.Timestamp] = None) -> tuple[pd.DataFrame, bool]:
     """
     对已过期且勾选「自动续费」的订阅，按订阅类型将「下次付费时间」推进到超过今天。
 
@@ -37,11 +40,14 @@ def apply_auto_renewals(df: pd.DataFrame) -> tuple[pd.DataFrame, bool]:
 
     Args:
         df: 已含「剩余天数」「自动续费」「订阅类型」「下次付费时间」的数据框
+        now: 当前时间，默认取 pd.Timestamp.now()
 
     Returns:
         (df, changed): 修改后的数据框与是否有变更
     """
-    today = pd.Timestamp.now().normalize()
+    if now is None:
+        now = pd.Timestamp.now()
+    today = now.normalize()
     mask = (
         (df['剩余天数'] < 0) &
         (df['自动续费'] == True) &
@@ -65,59 +71,228 @@ def apply_auto_renewals(df: pd.DataFrame) -> tuple[pd.DataFrame, bool]:
     return df, changed
 
 
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """
+    计算数据框内容指纹，用作 st.cache_data 的缓存键
+
+    Args:
+        df: 数据框
+
+    Returns:
+        str: 16 位十六进制摘要
+    """
+    row_hashes = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=8).hexdigest()
+
+
+# 一天对应的纳秒数
+_NS_PER_DAY = 86_400_000_000_000
+
+
+def compute_remaining_days(due: pd.Series, now: Optional[pd.Timestamp] = None) -> pd.Series:
+    """
+    计算距下次付费的剩余天数，结果与 (due - now).dt.days 一致（向下取整，缺失日期为 NaN）
+    
+    直接在 datetime64[ns] 的整数表示上做整除，不生成中间的 timedelta Series。
+    
+    Args:
+        due: 下次付费时间列
+        now: 当前时间，默认取 pd.Timestamp.now()
+        
+    Returns:
+        pd.Series: 剩余天数（无缺失时为 int64）
+    """
+    if now is None:
+        now = pd.Timestamp.now()
+    due_ns = due.to_numpy(dtype='datetime64[ns]')
+    days = (due_ns.view('i8') - now.value) // _NS_PER_DAY
+    missing = np.isnat(due_ns)
+    if missing.any():
+        days = np.where(missing, np.nan, days)
+    return pd.Series(days, index=due.index)
+
+
+def remaining_days_slice(df: pd.DataFrame, low: float, high: float) -> slice | np.ndarray:
+    """
+    获取剩余天数落在 [low, high] 内的行位置
+    
+    load_subscriptions 返回的数据已按「下次付费时间」排序，剩余天数随之单调不减
+    （缺失值排在末尾），此时用 np.searchsorted 二分得到连续区间；
+    其他来源的数据（导入、合并、重新排序等）未必有序，退回布尔掩码。
+    
+    Args:
+        df: 订阅数据框
+        low: 剩余天数下限（含）
+        high: 剩余天数上限（含）
+        
+    Returns:
+        slice | np.ndarray: 行位置区间或行位置数组，均可直接用于 df.iloc
+    """
+    days = df['剩余天数'].to_numpy(dtype=np.float64)
+    missing = np.isnan(days)
+    n_valid = len(days) - int(missing.sum())
+    if not missing[:n_valid].any() and (np.diff(days[:n_valid]) >= 0).all():
+        start = int(np.searchsorted(days[:n_valid], low, side='left'))
+        stop = int(np.searchsorted(days[:n_valid], high, side='right'))
+        return slice(start, stop)
+    return np.flatnonzero((days >= low) & (days <= high))
+
+
+def restore_file_order(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    恢复订阅数据在文件中的行顺序
+    
+    load_subscriptions 只对内存中的数据按下次付费时间排序，行索引仍是文件中的行号；
+    写回前按索引排序，保证编辑、导入不会打乱用户在 CSV 中的行顺序。
+    
+    Args:
+        df: 订阅数据框
+        
+    Returns:
+        pd.DataFrame: 按文件行顺序排列的数据框
+    """
+    if df.index.is_monotonic_increasing:
+        return df
+    return df.sort_index(kind='stable')
+
+
+def session_fingerprint(df: pd.DataFrame) -> str:
+    """
+    获取本次渲染的数据指纹
+    
+    main() 加载数据后会把 (id(df), 指纹) 写入 st.session_state['df_fp']。
+    传入的正是该数据框时直接复用，每次重跑只哈希一次；
+    未写入或传入的是其他数据框（筛选、修改后的副本等）时现算。
+    
+    Args:
+        df: 订阅数据框
+        
+    Returns:
+        str: 16 位十六进制摘要
+    """
+    cached = st.session_state.get('df_fp')
+    if cached is not None and cached[0] == id(df):
+        return cached[1]
+    return dataframe_fingerprint(df)
+
+
+def format_date_column(col: pd.Series) -> pd.Series:
+    """
+    将日期列格式化为 YYYY-MM-DD 字符串；已是 datetime 类型时跳过 to_datetime 转换
+    
+    Args:
+        col: 日期列（datetime 或可解析的字符串）
+        
+    Returns:
+        pd.Series: 格式化后的字符串列
+    """
+    if not pd.api.types.is_datetime64_any_dtype(col):
+        col = pd.to_datetime(col)
+    return col.dt.strftime('%Y-%m-%d')
+
+
 def save_subscriptions_core(df: pd.DataFrame) -> None:
     """
     将订阅数据写回 CSV，不调用 st 或清除缓存。
     供 load_subscriptions 与 remind 等非 UI 场景使用。失败时抛出异常。
     """
-    save_df = df.drop(columns=['剩余天数', '月均成本'], errors='ignore')
-    save_df['下次付费时间'] = pd.to_datetime(save_df['下次付费时间']).dt.strftime('%Y-%m-%d')
-    save_df['自动续费'] = save_df['自动续费'].map({True: 'TRUE', False: 'FALSE'})
+    save_df = restore_file_order(df).drop(columns=['剩余天数', '月均成本'], errors='ignore')
+    save_df['下次付费时间'] = format_date_column(save_df['下次付费时间'])
+    save_df['自动续费'] = np.where(save_df['自动续费'].eq(True), 'TRUE', 'FALSE')
     save_df.to_csv(SUBSCRIPTIONS_FILE, index=False, encoding=CSV_ENCODING)
 
 
-@st.cache_data(ttl=300)  # 缓存 5 分钟
-def load_subscriptions() -> pd.DataFrame:
+def load_subscriptions_core(path: Path | str = SUBSCRIPTIONS_FILE) -> pd.DataFrame:
     """
-    加载订阅数据
+    读取订阅 CSV 并完成类型转换，不调用 st、不做缓存。
+    供 load_subscriptions 与 remind 等非 UI 场景共用。失败时抛出异常。
     
+    Args:
+        path: 数据文件路径
+        
     Returns:
-        pd.DataFrame: 订阅数据框
+        pd.DataFrame: 订阅数据框（不含剩余天数、月均成本等衍生字段）
         
     Raises:
         FileNotFoundError: 文件不存在
         ValueError: 数据格式错误
     """
+    # pyarrow 引擎多线程解析，且直接将 TRUE/FALSE 列解析为布尔类型
+    df = pd.read_csv(path, encoding=CSV_ENCODING, engine='pyarrow')
+    
+    # 验证必需列
+    missing_cols = set(REQUIRED_COLUMNS) - set(df.columns)
+    if missing_cols:
+        raise ValueError(f"缺少必需的列: {missing_cols}")
+    
+    # 数据类型转换
+    df['下次付费时间'] = pd.to_datetime(df['下次付费时间'])
+    df['金额'] = pd.to_numeric(df['金额'], errors='coerce')
+    # pyarrow 已解析为布尔列时无需再转换；混有其他取值时用向量化字符串比较归一化
+    if df['自动续费'].dtype != bool:
+        df['自动续费'] = df['自动续费'].astype(str).str.strip().str.upper().eq('TRUE')
+    # 低基数文本列转为 category，比较、分组和计数都基于整数编码
+    df[CATEGORY_COLUMNS] = df[CATEGORY_COLUMNS].astype('category')
+    return df
+
+
+def file_mtime_ns(path: Path) -> int:
+    """获取文件修改时间（纳秒），文件不存在时返回 0"""
     try:
-        df = pd.read_csv(SUBSCRIPTIONS_FILE, encoding=CSV_ENCODING)
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def load_subscriptions() -> pd.DataFrame:
+    """
+    加载订阅数据（按文件修改时间缓存，文件变更后立即失效）
+    
+    Returns:
+        pd.DataFrame: 订阅数据框
+    """
+    return _load_subscriptions_cached(str(SUBSCRIPTIONS_FILE), file_mtime_ns(SUBSCRIPTIONS_FILE))
+
+
+@st.cache_data(ttl=300, show_spinner=False)  # 缓存 5 分钟（剩余天数随日期变化）
+def _load_subscriptions_cached(path: str, mtime_ns: int) -> pd.DataFrame:
+    """
+    解析订阅数据 CSV，缓存键为 (文件路径, 修改时间)
+    
+    Args:
+        path: 数据文件路径
+        mtime_ns: 文件修改时间（纳秒）
         
-        # 验证必需列
-        missing_cols = set(REQUIRED_COLUMNS) - set(df.columns)
-        if missing_cols:
-            raise ValueError(f"缺少必需的列: {missing_cols}")
+    Returns:
+        pd.DataFrame: 订阅数据框
         
-        # 数据类型转换
-        df['下次付费时间'] = pd.to_datetime(df['下次付费时间'])
-        df['金额'] = pd.to_numeric(df['金额'], errors='coerce')
-        df['自动续费'] = df['自动续费'].map({'TRUE': True, 'FALSE': False, True: True, False: False})
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 数据格式错误
+    """
+    try:
+        df = load_subscriptions_core(path)
         
-        # 计算衍生字段
-        df['剩余天数'] = (df['下次付费时间'] - pd.Timestamp.now()).dt.days
+        # 计算衍生字段（整个加载过程只取一次当前时间）
+        now = pd.Timestamp.now()
+        df['剩余天数'] = compute_remaining_days(df['下次付费时间'], now)
 
         # 对已过期且自动续费的订阅，按周期推进「下次付费时间」并写回
-        df, changed = apply_auto_renewals(df)
+        df, changed = apply_auto_renewals(df, now)
         if changed:
-            df['剩余天数'] = (df['下次付费时间'] - pd.Timestamp.now()).dt.days
+            df['剩余天数'] = compute_remaining_days(df['下次付费时间'], now)
             try:
+                # 写回后文件修改时间变化，缓存键随之失效，无需手动清除
                 save_subscriptions_core(df)
-                st.cache_data.clear()
             except Exception as e:
                 st.error(f"❌ 自动续期后保存失败: {str(e)}")
 
         # 计算月均成本
-        df['月均成本'] = df.apply(lambda row: calculate_monthly_cost(row), axis=1)
+        df['月均成本'] = calculate_monthly_costs(df)
         
-        return df
+        # 按下次付费时间排序，组件可直接按剩余天数二分切片；
+        # 保留原行索引（即文件行号），写回时据此恢复文件中的行顺序
+        return df.sort_values('下次付费时间', kind='stable')
         
     except FileNotFoundError:
         st.error(f"❌ 找不到数据文件: {SUBSCRIPTIONS_FILE}")
@@ -129,6 +304,73 @@ def load_subscriptions() -> pd.DataFrame:
         return pd.DataFrame()
 
 
+# 订阅类型 -> 每月分摊的周期月数（终身为无穷大，月均成本即为 0）
+_CYCLE_MONTHS = {
+    '月付': 1.0,
+    '年付': 12.0,
+    '季付': 3.0,
+    '半年付': 6.0,
+    '终身': np.inf,
+}
+
+
+def _lookup_by_code(series: pd.Series, mapping: dict, default: float) -> np.ndarray:
+    """
+    按映射表将一列转换为浮点数组；分类列只对类别做一次映射，再按整数编码取值
+    
+    Args:
+        series: 待转换的列
+        mapping: 取值 -> 浮点数 的映射
+        default: 未知值或缺失值使用的默认值
+        
+    Returns:
+        np.ndarray: 与 series 等长的 float64 数组
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # 末尾追加默认值，缺失值编码 -1 恰好取到它
+        table = np.append(
+            series.cat.categories.map(lambda v: mapping.get(v, default)).to_numpy(dtype=np.float64),
+            default
+        )
+        return table[series.cat.codes.to_numpy()]
+    return series.map(mapping).fillna(default).to_numpy(dtype=np.float64)
+
+
+def calculate_monthly_costs(df: pd.DataFrame) -> pd.Series:
+    """
+    向量化计算整列月均成本（统一转换为泰铢 THB），结果与逐行 calculate_monthly_cost 一致
+    
+    Args:
+        df: 订阅数据框
+        
+    Returns:
+        pd.Series: 月均成本（THB）
+    """
+    # 延迟导入避免循环依赖
+    from .currency import get_float_rates, round_half_up
+    
+    amounts = df['金额'].to_numpy(dtype=np.float64)
+    if '货币' in df.columns:
+        currencies = df['货币']
+        is_thb = currencies.isna().to_numpy() | currencies.eq('THB').to_numpy()
+    else:
+        is_thb = None
+    
+    if is_thb is None or is_thb.all():
+        # 全部为泰铢时无需获取汇率
+        amount_thb = amounts
+    else:
+        # 汇率只获取一次；未知货币按 1 处理
+        rates = _lookup_by_code(currencies, get_float_rates(), 1.0)
+        # 与 convert_to_thb 相同：非泰铢金额换算后按 ROUND_HALF_UP 保留两位小数
+        converted = round_half_up(amounts * rates)
+        amount_thb = np.where(is_thb, amounts, converted)
+    
+    # 未知订阅类型默认按月付计算
+    months = _lookup_by_code(df['订阅类型'], _CYCLE_MONTHS, 1.0)
+    return pd.Series(amount_thb / months, index=df.index)
+
+
 def calculate_monthly_cost(row: pd.Series) -> float:
     """
     计算月均成本（统一转换为泰铢 THB）
@@ -164,22 +406,32 @@ def calculate_monthly_cost(row: pd.Series) -> float:
         return amount_thb  # 默认按月付计算
 
 
-@st.cache_data
 def load_service_types() -> list[str]:
-    """加载服务类型枚举"""
+    """加载服务类型枚举（按文件修改时间缓存）"""
+    return _load_service_types_cached(str(SERVICE_FILE), file_mtime_ns(SERVICE_FILE))
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _load_service_types_cached(path: str, mtime_ns: int) -> list[str]:
+    """解析服务类型 CSV，缓存键为 (文件路径, 修改时间)"""
     try:
-        df = pd.read_csv(SERVICE_FILE, encoding=CSV_ENCODING)
+        df = pd.read_csv(path, encoding=CSV_ENCODING)
         return df['服务性质'].tolist()
     except Exception as e:
         st.warning(f"⚠️ 加载服务类型失败: {e}")
         return ['AI', '视频', '软件', '系统', '其他']
 
 
-@st.cache_data
 def load_subscribe_types() -> list[str]:
-    """加载订阅类型枚举"""
+    """加载订阅类型枚举（按文件修改时间缓存）"""
+    return _load_subscribe_types_cached(str(SUBSCRIBE_TYPE_FILE), file_mtime_ns(SUBSCRIBE_TYPE_FILE))
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _load_subscribe_types_cached(path: str, mtime_ns: int) -> list[str]:
+    """解析订阅类型 CSV，缓存键为 (文件路径, 修改时间)"""
     try:
-        df = pd.read_csv(SUBSCRIBE_TYPE_FILE, encoding=CSV_ENCODING)
+        df = pd.read_csv(path, encoding=CSV_ENCODING)
         return df['订阅类型'].tolist()
     except Exception as e:
         st.warning(f"⚠️ 加载订阅类型失败: {e}")
@@ -198,27 +450,46 @@ def save_subscriptions(df: pd.DataFrame) -> bool:
     """
     try:
         save_subscriptions_core(df)
-        st.cache_data.clear()
+        # 只清除订阅数据缓存，服务类型等枚举缓存保持命中
+        _load_subscriptions_cached.clear()
+        # 数据已变更，作废本次渲染的指纹
+        st.session_state.pop('df_fp', None)
         return True
     except Exception as e:
         st.error(f"❌ 保存数据失败: {str(e)}")
         return False
 
 
-def add_subscription(data: dict) -> bool:
+def add_subscription(data: dict, df: Optional[pd.DataFrame] = None) -> bool:
     """
     添加新订阅
     
     Args:
         data: 订阅数据字典
+        df: 当前订阅数据；调用方已持有时传入可省去重新加载
+        
+    Returns:
+        bool: 添加是否成功
+    """
+    return add_subscriptions([data], df)
+
+
+def add_subscriptions(rows: list[dict], df: Optional[pd.DataFrame] = None) -> bool:
+    """
+    批量添加订阅（只读取、拼接、写回各一次）
+    
+    Args:
+        rows: 订阅数据字典列表
+        df: 当前订阅数据；调用方已持有时传入可省去重新加载
         
     Returns:
         bool: 添加是否成功
     """
     try:
-        df = load_subscriptions()
-        new_row = pd.DataFrame([data])
-        updated_df = pd.concat([df, new_row], ignore_index=True)
+        if df is None:
+            df = load_subscriptions()
+        new_rows = pd.DataFrame(rows)
+        updated_df = pd.concat([restore_file_order(df), new_rows], ignore_index=True)
         return save_subscriptions(updated_df)
         
     except Exception as e:
@@ -226,19 +497,21 @@ def add_subscription(data: dict) -> bool:
         return False
 
 
-def delete_subscription(index: int) -> bool:
+def delete_subscription(index: int, df: Optional[pd.DataFrame] = None) -> bool:
     """
     删除订阅
     
     Args:
         index: 要删除的行索引
+        df: 当前订阅数据；调用方已持有时传入可省去重新加载
         
     Returns:
         bool: 删除是否成功
     """
     try:
-        df = load_subscriptions()
-        updated_df = df.drop(index=index).reset_index(drop=True)
+        if df is None:
+            df = load_subscriptions()
+        updated_df = restore_file_order(df.drop(index=index)).reset_index(drop=True)
         return save_subscriptions(updated_df)
         
     except Exception as e:
@@ -246,27 +519,31 @@ def delete_subscription(index: int) -> bool:
         return False
 
 
-def update_subscription(index: int, data: dict) -> bool:
+def update_subscription(index: int, data: dict, df: Optional[pd.DataFrame] = None) -> bool:
     """
     更新订阅信息
     
     Args:
         index: 要更新的行索引
         data: 更新后的订阅数据字典
+        df: 当前订阅数据；调用方已持有时传入可省去重新加载（不会修改传入的数据框）
         
     Returns:
         bool: 更新是否成功
     """
     try:
-        df = load_subscriptions()
+        df = load_subscriptions() if df is None else df.copy()
         
-        if index < 0 or index >= len(df):
+        if index not in df.index:
             st.error("❌ 无效的订阅索引")
             return False
         
         # 更新指定行的数据
         for key, value in data.items():
             if key in df.columns:
+                # category 列写入新取值前需先登记该类别
+                if isinstance(df[key].dtype, pd.CategoricalDtype) and value not in df[key].cat.categories:
+                    df[key] = df[key].cat.add_categories([value])
                 df.at[index, key] = value
         
         return save_subscriptions(df)
@@ -1,41 +1,81 @@
 """
 导出模块 - 导出订阅数据为 CSV 格式
 """
+import os
 from datetime import datetime
+from functools import partial
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 from ..config import CURRENCY_SYMBOL
+from .data_loader import format_date_column, session_fingerprint
 
+# 导出列（按此顺序输出，数据中不存在的列跳过）
+EXPORT_COLUMNS = (
+    '名称', '供应商', '服务性质', '订阅类型',
+    '金额', '月均成本', '下次付费时间', '剩余天数', '自动续费'
+)
 
-def export_to_csv(df: pd.DataFrame) -> str:
+
+def _export_columns(df: pd.DataFrame) -> list[str]:
+    """按导出顺序返回数据框中存在的导出列"""
+    return [col for col in EXPORT_COLUMNS if col in df.columns]
+
+
+def _prepare_export_view(df: pd.DataFrame) -> pd.DataFrame:
     """
-    导出订阅数据为 CSV 格式
+    构建导出视图：投影导出列，并将日期、布尔值格式化为字符串
     
     Args:
         df: 订阅数据框
         
     Returns:
-        str: CSV 格式的字符串
+        pd.DataFrame: 可直接写出的导出数据框
     """
-    export_df = df.copy()
+    # 先投影导出列再格式化，只复制导出所需的列
+    export_df = df[_export_columns(df)].copy()
     
     # 格式化日期
     if '下次付费时间' in export_df.columns:
-        export_df['下次付费时间'] = pd.to_datetime(export_df['下次付费时间']).dt.strftime('%Y-%m-%d')
+        export_df['下次付费时间'] = format_date_column(export_df['下次付费时间'])
     
     # 格式化布尔值
     if '自动续费' in export_df.columns:
-        export_df['自动续费'] = export_df['自动续费'].map({True: 'TRUE', False: 'FALSE'})
+        export_df['自动续费'] = np.where(export_df['自动续费'].eq(True), 'TRUE', 'FALSE')
     
-    # 选择导出列
-    export_columns = [
-        '名称', '供应商', '服务性质', '订阅类型',
-        '金额', '月均成本', '下次付费时间', '剩余天数', '自动续费'
-    ]
-    export_df = export_df[[col for col in export_columns if col in export_df.columns]]
+    return export_df
+
+
+def export_to_csv(df: pd.DataFrame) -> str:
+    """
+    导出订阅数据为 CSV 格式
+    
+    Args:
+        df: 订阅数据框
+        
+    Returns:
+        str: CSV 格式的字符串
+    """
+    if len(df) == 0:
+        # 无数据行时只有表头；导出列名均为固定中文列名，无需转义（换行符与 to_csv 默认一致）
+        return ','.join(_export_columns(df)) + os.linesep
+    return _prepare_export_view(df).to_csv(index=False, encoding='utf-8-sig')
+
+
+@st.cache_data(show_spinner=False)
+def _export_csv_cached(df_hash: str, _df: pd.DataFrame) -> str:
+    """
+    按数据指纹缓存 CSV 导出结果
     
-    return export_df.to_csv(index=False, encoding='utf-8-sig')
+    Args:
+        df_hash: 数据框指纹，作为缓存键
+        _df: 订阅数据框（不参与哈希）
+        
+    Returns:
+        str: CSV 格式的字符串
+    """
+    return export_to_csv(_df)
 
 
 def render_export_buttons(df: pd.DataFrame):
@@ -50,11 +90,10 @@ def render_export_buttons(df: pd.DataFrame):
     
     now = datetime.now().strftime('%Y%m%d')
     
-    # CSV 导出
-    csv_data = export_to_csv(df)
+    # CSV 导出：点击下载时才生成，结果按数据指纹缓存
     st.download_button(
         label="📄 下载 CSV",
-        data=csv_data,
+        data=partial(_export_csv_cached, session_fingerprint(df), df),
         file_name=f"subscriptions_{now}.csv",
         mime="text/csv",
         width='stretch',
@@ -2,12 +2,14 @@
 历史数据模块 - 记录和分析订阅支出趋势
 """
 import pandas as pd
+import numpy as np
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 import streamlit as st
 
 from ..config import DATA_DIR, CSV_ENCODING
+from .data_loader import file_mtime_ns, format_date_column
 
 
 # 历史数据文件路径
@@ -29,19 +31,29 @@ HISTORY_COLUMNS = [
 
 def load_history() -> pd.DataFrame:
     """
-    加载历史数据
+    加载历史数据（按文件修改时间缓存，同一次渲染中的多次调用只解析一次）
     
     Returns:
         pd.DataFrame: 历史数据框
     """
-    try:
-        if not HISTORY_FILE.exists():
+    if not HISTORY_FILE.exists():
+        try:
             # 创建空的历史文件
             df = pd.DataFrame(columns=HISTORY_COLUMNS)
             df.to_csv(HISTORY_FILE, index=False, encoding=CSV_ENCODING)
             return df
-        
-        df = pd.read_csv(HISTORY_FILE, encoding=CSV_ENCODING)
+        except Exception as e:
+            st.warning(f"⚠️ 加载历史数据失败: {e}")
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+    
+    return _load_history_cached(str(HISTORY_FILE), file_mtime_ns(HISTORY_FILE))
+
+
+@st.cache_data(show_spinner=False)
+def _load_history_cached(path: str, mtime_ns: int) -> pd.DataFrame:
+    """解析历史数据 CSV，缓存键为 (文件路径, 修改时间)"""
+    try:
+        df = pd.read_csv(path, encoding=CSV_ENCODING)
         df['日期'] = pd.to_datetime(df['日期'])
         return df
         
@@ -62,7 +74,7 @@ def save_history(df: pd.DataFrame) -> bool:
     """
     try:
         save_df = df.copy()
-        save_df['日期'] = pd.to_datetime(save_df['日期']).dt.strftime('%Y-%m-%d')
+        save_df['日期'] = format_date_column(save_df['日期'])
         save_df.to_csv(HISTORY_FILE, index=False, encoding=CSV_ENCODING)
         return True
     except Exception as e:
@@ -70,12 +82,14 @@ def save_history(df: pd.DataFrame) -> bool:
         return False
 
 
-def record_monthly_snapshot(subscriptions_df: pd.DataFrame) -> bool:
+def record_monthly_snapshot(subscriptions_df: pd.DataFrame,
+                            history_df: Optional[pd.DataFrame] = None) -> bool:
     """
     记录月度快照
     
     Args:
         subscriptions_df: 当前订阅数据框
+        history_df: 已加载的历史数据，为 None 时自动加载
         
     Returns:
         bool: 记录是否成功
@@ -85,34 +99,45 @@ def record_monthly_snapshot(subscriptions_df: pd.DataFrame) -> bool:
     
     today = datetime.now().date()
     
-    # 检查是否已有当月记录
-    history_df = load_history()
-    if not history_df.empty:
-        history_df['月份'] = pd.to_datetime(history_df['日期']).dt.to_period('M')
-        current_month = pd.Period(today, freq='M')
-        if current_month in history_df['月份'].values:
-            # 更新当月记录而非新增
-            mask = history_df['月份'] == current_month
-            history_df = history_df[~mask]
-        history_df = history_df.drop(columns=['月份'])
-    
-    # 计算各类支出
-    category_expenses = subscriptions_df.groupby('服务性质')['月均成本'].sum()
+    # 计算总支出与各类支出（各汇总一次）
+    total = subscriptions_df['月均成本'].sum()
+    category_expenses = (
+        subscriptions_df.groupby('服务性质', observed=True, sort=False)['月均成本'].sum()
+        .reindex(['AI', '视频', '软件', '系统', '其他', '音乐'], fill_value=0)
+        .to_numpy()
+    )
+    ai, video, software, system, other, music = category_expenses
     
     # 创建新记录
     new_record = {
         '日期': today.strftime('%Y-%m-%d'),
         '订阅总数': len(subscriptions_df),
-        '月均总支出': subscriptions_df['月均成本'].sum(),
-        '年度预估': subscriptions_df['月均成本'].sum() * 12,
-        'AI支出': category_expenses.get('AI', 0),
-        '视频支出': category_expenses.get('视频', 0),
-        '软件支出': category_expenses.get('软件', 0),
-        '系统支出': category_expenses.get('系统', 0),
-        '其他支出': category_expenses.get('其他', 0) + 
-                   category_expenses.get('音乐', 0)  # 归入其他
+        '月均总支出': total,
+        '年度预估': total * 12,
+        'AI支出': ai,
+        '视频支出': video,
+        '软件支出': software,
+        '系统支出': system,
+        '其他支出': other + music  # 音乐归入其他
     }
     
+    # 检查是否已有当月记录
+    if history_df is None:
+        history_df = load_history()
+    if not history_df.empty:
+        dates = pd.to_datetime(history_df['日期'])
+        mask = dates.dt.strftime('%Y-%m') == today.strftime('%Y-%m')
+        if mask.sum() == 1:
+            # 今日已记录且数据未变化时无需重写文件
+            existing = history_df.loc[mask].iloc[0]
+            numeric_cols = HISTORY_COLUMNS[1:]
+            if (dates[mask].iloc[0].date() == today and
+                    np.allclose(existing.reindex(numeric_cols).to_numpy(dtype=float),
+                                [new_record[col] for col in numeric_cols], rtol=0, atol=1e-9)):
+                return True
+        # 更新当月记录而非新增
+        history_df = history_df[~mask]
+    
     # 添加新记录
     new_row = pd.DataFrame([new_record])
     updated_df = pd.concat([history_df, new_row], ignore_index=True)
@@ -120,17 +145,19 @@ def record_monthly_snapshot(subscriptions_df: pd.DataFrame) -> bool:
     return save_history(updated_df)
 
 
-def get_expense_trend(months: int = 12) -> pd.DataFrame:
+def get_expense_trend(months: int = 12, history_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """
     获取支出趋势数据
     
     Args:
         months: 获取最近多少个月的数据
+        history_df: 已加载的历史数据，为 None 时自动加载
         
     Returns:
         pd.DataFrame: 趋势数据
     """
-    history_df = load_history()
+    if history_df is None:
+        history_df = load_history()
     
     if history_df.empty:
         return pd.DataFrame()
@@ -142,18 +169,20 @@ def get_expense_trend(months: int = 12) -> pd.DataFrame:
     return history_df
 
 
-def get_category_trend(category: str, months: int = 12) -> pd.DataFrame:
+def get_category_trend(category: str, months: int = 12,
+                       history_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """
     获取指定类别的支出趋势
     
     Args:
         category: 服务类别 (AI/视频/软件/系统/其他)
         months: 获取最近多少个月的数据
+        history_df: 已加载的历史数据，为 None 时自动加载
         
     Returns:
         pd.DataFrame: 类别趋势数据
     """
-    history_df = get_expense_trend(months)
+    history_df = get_expense_trend(months, history_df)
     
     if history_df.empty:
         return pd.DataFrame()
@@ -173,23 +202,42 @@ def get_category_trend(category: str, months: int = 12) -> pd.DataFrame:
     return pd.DataFrame()
 
 
-def calculate_growth_rate() -> Optional[float]:
+def compute_growth_rate(values: np.ndarray) -> Optional[float]:
     """
-    计算月度支出环比增长率
+    根据按日期升序排列的月均总支出序列计算环比增长率
     
+    Args:
+        values: 月均总支出数组（按日期升序）
+        
     Returns:
-        float: 增长率（百分比），如最近月无数据则返回 None
+        float: 增长率（百分比），数据不足或上期为 0 时返回 None
     """
-    history_df = get_expense_trend(2)
-    
-    if len(history_df) < 2:
+    if len(values) < 2:
         return None
     
-    current = history_df.iloc[-1]['月均总支出']
-    previous = history_df.iloc[-2]['月均总支出']
+    current = float(values[-1])
+    previous = float(values[-2])
     
     if previous == 0:
         return None
     
     growth_rate = ((current - previous) / previous) * 100
     return round(growth_rate, 2)
+
+
+def calculate_growth_rate(history_df: Optional[pd.DataFrame] = None) -> Optional[float]:
+    """
+    计算月度支出环比增长率
+    
+    Args:
+        history_df: 已加载的历史数据，为 None 时自动加载
+        
+    Returns:
+        float: 增长率（百分比），如最近月无数据则返回 None
+    """
+    history_df = get_expense_trend(2, history_df)
+    
+    if history_df.empty:
+        return None
+    
+    return compute_growth_rate(history_df['月均总支出'].to_numpy())
@@ -1,7 +1,7 @@
 """
 数据导入模块 - 支持从文件导入订阅数据（备份恢复）
 """
-import io
+import json
 import pandas as pd
 import streamlit as st
 from pathlib import Path
@@ -14,7 +14,14 @@ from ..config import (
     DEFAULT_CURRENCY
 )
 from .validator import validate_dataframe, ValidationError
-from .data_loader import save_subscriptions, load_subscriptions
+from .data_loader import save_subscriptions, load_subscriptions, restore_file_order
+
+# 布尔值支持的多种写法（统一转大写后比较）；不在真值集合中的一律视为 False
+_TRUE_VALUES = frozenset(['TRUE', 'T', 'YES', 'Y', '1', '是', '真'])
+_FALSE_VALUES = frozenset(['FALSE', 'F', 'NO', 'N', '0', '否', '假'])
+
+# 加载时重新计算的衍生列，导入/合并时不保存
+_DERIVED_COLUMNS = ('剩余天数', '月均成本')
 
 
 def parse_csv_file(uploaded_file) -> Optional[pd.DataFrame]:
@@ -28,11 +35,12 @@ def parse_csv_file(uploaded_file) -> Optional[pd.DataFrame]:
         pd.DataFrame: 解析后的数据框，失败返回 None
     """
     try:
-        # 读取 CSV 文件
+        # 读取 CSV 文件（pyarrow 引擎多线程解析）
         df = pd.read_csv(
             uploaded_file,
             encoding=CSV_ENCODING,
-            dtype=str  # 先全部读取为字符串，后续转换
+            dtype=str,  # 先全部读取为字符串，后续转换
+            engine='pyarrow'
         )
         
         # 检查必需的列
@@ -90,9 +98,12 @@ def parse_json_file(uploaded_file) -> Optional[pd.DataFrame]:
         pd.DataFrame: 解析后的数据框，失败返回 None
     """
     try:
-        # 读取 JSON 文件
-        content = uploaded_file.read()
-        data = pd.read_json(io.BytesIO(content), orient='records')
+        # 读取 JSON 文件：标准库 json（C 实现）解析后直接按记录构建数据框
+        records = json.loads(uploaded_file.read())
+        if not isinstance(records, list):
+            st.error("❌ JSON 文件应为订阅记录数组")
+            return None
+        data = pd.DataFrame.from_records(records)
         
         # 检查必需的列
         missing_cols = [col for col in REQUIRED_COLUMNS if col not in data.columns]
@@ -119,13 +130,13 @@ def clean_imported_data(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: 清洗后的数据框
     """
-    # 去除前后空格
-    for col in df.columns:
-        if df[col].dtype == 'object':
-            df[col] = df[col].astype(str).str.strip()
-    
-    # 处理空值
-    df = df.replace(['', 'nan', 'None', 'null'], pd.NA)
+    # 文本列去除前后空格并处理空值，每列只遍历一次
+    # （保留 astype(str)：JSON 导入的列可能混有数字，直接 .str.strip() 会把数字变为缺失值）
+    text_cols = df.select_dtypes(include=['object', 'string']).columns
+    if len(text_cols):
+        df[text_cols] = df[text_cols].apply(
+            lambda col: col.astype(str).str.strip().replace(['', 'nan', 'None', 'null'], pd.NA)
+        )
     
     # 转换数据类型
     if '金额' in df.columns:
@@ -143,7 +154,7 @@ def clean_imported_data(df: pd.DataFrame) -> pd.DataFrame:
     
     # 处理布尔值
     if '自动续费' in df.columns:
-        df['自动续费'] = df['自动续费'].apply(parse_boolean)
+        df['自动续费'] = parse_boolean_series(df['自动续费'])
     
     # 处理货币字段（如果缺失，使用默认值）
     if '货币' not in df.columns or df['货币'].isna().all():
@@ -171,18 +182,61 @@ def parse_boolean(value: Any) -> bool:
     
     value_str = str(value).strip().upper()
     
-    # 支持多种格式
-    true_values = ['TRUE', 'T', 'YES', 'Y', '1', '是', '真', 'TRUE']
-    false_values = ['FALSE', 'F', 'NO', 'N', '0', '否', '假', 'FALSE']
-    
-    if value_str in true_values:
+    if value_str in _TRUE_VALUES:
         return True
-    elif value_str in false_values:
+    elif value_str in _FALSE_VALUES:
         return False
     else:
         return False  # 默认值
 
 
+def parse_boolean_series(values: pd.Series) -> pd.Series:
+    """
+    向量化解析整列布尔值，结果与逐个调用 parse_boolean 一致
+    
+    Args:
+        values: 输入列
+        
+    Returns:
+        pd.Series: 布尔列
+    """
+    # 缺失值转字符串后为 'nan' / '<NA>' / 'NONE'，不在真值集合中，自然得到 False
+    return values.astype(str).str.strip().str.upper().isin(_TRUE_VALUES)
+
+
+def merge_by_name(existing_df: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    按名称合并：已存在的名称原位更新第一条同名记录，新名称按首次出现顺序追加到末尾；
+    导入数据中重名时以最后一条为准
+    
+    Args:
+        existing_df: 现有数据框
+        new_df: 导入的数据框
+        
+    Returns:
+        pd.DataFrame: 合并后的数据框
+    """
+    existing_df = existing_df.reset_index(drop=True)
+    names = existing_df['名称']
+    latest = new_df.drop_duplicates(subset=['名称'], keep='last').set_index('名称', drop=False)
+    
+    # 被更新的行沿用原行号，排序后即回到原位置
+    replace_mask = ~names.duplicated() & names.isin(latest.index)
+    replaced = latest.loc[names[replace_mask]].set_axis(names.index[replace_mask])
+    
+    # 新名称的行号接在现有数据之后
+    order = new_df['名称'].drop_duplicates()
+    new_names = order[~order.isin(names)]
+    appended = latest.loc[new_names].set_axis(range(len(existing_df), len(existing_df) + len(new_names)))
+    
+    return pd.concat([existing_df[~replace_mask], replaced, appended]).sort_index().reset_index(drop=True)
+
+
+def _without_derived(df: pd.DataFrame) -> pd.DataFrame:
+    """按列选择去除衍生列（不复制数据）"""
+    return df[[col for col in df.columns if col not in _DERIVED_COLUMNS]]
+
+
 def import_subscriptions(df: pd.DataFrame, merge_mode: str = 'replace') -> bool:
     """
     导入订阅数据
@@ -209,20 +263,20 @@ def import_subscriptions(df: pd.DataFrame, merge_mode: str = 'replace') -> bool:
             st.warning(f"⚠️ 数据验证警告: {str(e)}，将继续导入")
         
         # 移除计算字段（这些字段会在加载时重新计算）
-        df_clean = df.drop(columns=['剩余天数', '月均成本'], errors='ignore')
+        df_clean = _without_derived(df)
         
         # 根据合并模式处理数据
         if merge_mode == 'replace':
             # 直接替换
-            result_df = df_clean.copy()
+            result_df = df_clean
         elif merge_mode == 'append':
             # 追加到现有数据
             existing_df = load_subscriptions()
             if existing_df.empty:
-                result_df = df_clean.copy()
+                result_df = df_clean
             else:
-                # 移除计算字段以便合并
-                existing_df_clean = existing_df.drop(columns=['剩余天数', '月均成本'], errors='ignore')
+                # 移除计算字段以便合并（按文件行顺序，避免写回时打乱原有顺序）
+                existing_df_clean = _without_derived(restore_file_order(existing_df))
                 result_df = pd.concat([existing_df_clean, df_clean], ignore_index=True)
                 # 去除重复（基于名称）
                 result_df = result_df.drop_duplicates(subset=['名称'], keep='last')
@@ -230,21 +284,12 @@ def import_subscriptions(df: pd.DataFrame, merge_mode: str = 'replace') -> bool:
             # 合并（更新现有，添加新的）
             existing_df = load_subscriptions()
             if existing_df.empty:
-                result_df = df_clean.copy()
+                result_df = df_clean
             else:
-                # 移除计算字段以便合并
-                existing_df_clean = existing_df.drop(columns=['剩余天数', '月均成本'], errors='ignore')
+                # 移除计算字段以便合并（按文件行顺序，避免写回时打乱原有顺序）
+                existing_df_clean = _without_derived(restore_file_order(existing_df))
                 
-                # 合并数据框
-                result_df = existing_df_clean.copy()
-                for _, row in df_clean.iterrows():
-                    name = row['名称']
-                    # 如果存在则更新，否则追加
-                    if name in result_df['名称'].values:
-                        idx = result_df[result_df['名称'] == name].index[0]
-                        result_df.loc[idx] = row
-                    else:
-                        result_df = pd.concat([result_df, pd.DataFrame([row])], ignore_index=True)
+                result_df = merge_by_name(existing_df_clean, df_clean)
         else:
             st.error(f"❌ 未知的合并模式: {merge_mode}")
             return False
@@ -7,16 +7,19 @@
 - 持久化保存发送状态到 CSV
 - 订阅过期后自动停止提醒
 """
+import atexit
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime, timedelta
+from email.message import EmailMessage
+from datetime import date, datetime, timedelta
 from typing import Optional
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import os
 from dotenv import load_dotenv
 
+from ..config import REMINDER_DAYS
+
 # 加载环境变量
 load_dotenv()
 
@@ -29,23 +32,36 @@ CSV_ENCODING = "utf-8-sig"
 LOG_COLUMNS = ['subscription_name', 'sent_date', 'days_remaining', 'email_sent']
 
 # 默认预警天数
-DEFAULT_WARNING_DAYS = 3
+DEFAULT_WARNING_DAYS = REMINDER_DAYS
+
+# 已解析的通知日志缓存，键为 (路径, 修改时间, 文件大小)
+_LOG_CACHE: dict[tuple, pd.DataFrame] = {}
 
 
 def load_notification_log() -> pd.DataFrame:
     """
-    加载通知发送日志
+    加载通知发送日志（文件未变化时直接复用上次解析结果）
     
     Returns:
         pd.DataFrame: 发送日志数据框
     """
-    if not NOTIFICATION_LOG_FILE.exists():
+    try:
+        stat = NOTIFICATION_LOG_FILE.stat()
+    except OSError:
         return pd.DataFrame(columns=LOG_COLUMNS)
     
+    key = (str(NOTIFICATION_LOG_FILE), stat.st_mtime_ns, stat.st_size)
+    cached = _LOG_CACHE.get(key)
+    if cached is not None:
+        return cached.copy()
+    
     try:
         df = pd.read_csv(NOTIFICATION_LOG_FILE, encoding=CSV_ENCODING)
-        df['sent_date'] = pd.to_datetime(df['sent_date']).dt.date
-        return df
+        # 以 datetime64 存储发送日期，按日比较走 NumPy 整数运算而非逐个 date 对象
+        df['sent_date'] = pd.to_datetime(df['sent_date'])
+        _LOG_CACHE.clear()
+        _LOG_CACHE[key] = df
+        return df.copy()
     except Exception as e:
         print(f"加载通知日志失败: {e}")
         return pd.DataFrame(columns=LOG_COLUMNS)
@@ -62,9 +78,9 @@ def save_notification_log(df: pd.DataFrame) -> bool:
         bool: 保存是否成功
     """
     try:
-        save_df = df.copy()
-        save_df['sent_date'] = pd.to_datetime(save_df['sent_date']).dt.strftime('%Y-%m-%d')
-        save_df.to_csv(NOTIFICATION_LOG_FILE, index=False, encoding=CSV_ENCODING)
+        # sent_date 为 datetime64 列，按 date_format 写出为 YYYY-MM-DD
+        df.to_csv(NOTIFICATION_LOG_FILE, index=False, encoding=CSV_ENCODING, date_format='%Y-%m-%d')
+        _LOG_CACHE.clear()
         return True
     except Exception as e:
         print(f"保存通知日志失败: {e}")
@@ -82,19 +98,27 @@ def should_send_reminder(subscription_name: str, log_df: pd.DataFrame) -> bool:
     Returns:
         bool: True 表示应该发送，False 表示今日已发送
     """
-    today = datetime.now().date()
+    return subscription_name not in names_sent_today(log_df)
+
+
+def names_sent_today(log_df: pd.DataFrame, today: Optional[date] = None) -> set:
+    """
+    获取今天已成功发送过提醒的订阅名称
     
+    Args:
+        log_df: 发送日志数据框
+        today: 当天日期，默认取当前日期
+        
+    Returns:
+        set: 订阅名称集合
+    """
     if log_df.empty:
-        return True
-    
-    # 检查今天是否已经发送过
-    today_sent = log_df[
-        (log_df['subscription_name'] == subscription_name) &
-        (log_df['sent_date'] == today) &
-        (log_df['email_sent'] == True)
-    ]
+        return set()
     
-    return today_sent.empty
+    if today is None:
+        today = datetime.now().date()
+    sent = (log_df['sent_date'] == np.datetime64(today, 'D')) & (log_df['email_sent'] == True)
+    return set(log_df.loc[sent, 'subscription_name'].tolist())
 
 
 def record_sent_notification(
@@ -115,24 +139,52 @@ def record_sent_notification(
     Returns:
         pd.DataFrame: 更新后的日志数据框
     """
-    new_record = {
-        'subscription_name': subscription_name,
-        'sent_date': datetime.now().date(),
+    return record_sent_notifications(log_df, [subscription_name], [days_remaining], email_sent)
+
+
+def record_sent_notifications(
+    log_df: pd.DataFrame,
+    subscription_names: list,
+    days_remaining: list,
+    email_sent: bool = True,
+    today: Optional[date] = None
+) -> pd.DataFrame:
+    """
+    批量记录发送的通知（一次性追加，避免逐条 concat 反复复制日志）
+    
+    Args:
+        log_df: 当前日志数据框
+        subscription_names: 订阅名称列表
+        days_remaining: 对应的剩余天数列表
+        email_sent: 是否成功发送
+        today: 发送日期，默认取当前日期
+        
+    Returns:
+        pd.DataFrame: 更新后的日志数据框
+    """
+    if today is None:
+        today = datetime.now().date()
+    new_rows = pd.DataFrame({
+        'subscription_name': subscription_names,
+        'sent_date': np.datetime64(today, 'D'),
         'days_remaining': days_remaining,
         'email_sent': email_sent
-    }
-    
-    new_row = pd.DataFrame([new_record])
-    return pd.concat([log_df, new_row], ignore_index=True)
+    })
+    if log_df.empty:
+        # 空日志不参与拼接，避免空列影响结果类型
+        return new_rows
+    return pd.concat([log_df, new_rows], ignore_index=True)
 
 
-def cleanup_old_logs(log_df: pd.DataFrame, days_to_keep: int = 30) -> pd.DataFrame:
+def cleanup_old_logs(log_df: pd.DataFrame, days_to_keep: int = 30,
+                     today: Optional[date] = None) -> pd.DataFrame:
     """
     清理过期的日志记录
     
     Args:
         log_df: 日志数据框
         days_to_keep: 保留最近多少天的记录
+        today: 当天日期，默认取当前日期
         
     Returns:
         pd.DataFrame: 清理后的日志数据框
@@ -140,8 +192,12 @@ def cleanup_old_logs(log_df: pd.DataFrame, days_to_keep: int = 30) -> pd.DataFra
     if log_df.empty:
         return log_df
     
-    cutoff_date = datetime.now().date() - timedelta(days=days_to_keep)
-    return log_df[log_df['sent_date'] >= cutoff_date].copy()
+    if today is None:
+        today = datetime.now().date()
+    cutoff_date = today - timedelta(days=days_to_keep)
+    
+    # sent_date 为 datetime64 列，整列一次比较（不假设日志文件有序）
+    return log_df[log_df['sent_date'] >= np.datetime64(cutoff_date, 'D')].copy()
 
 
 def get_upcoming_subscriptions(df: pd.DataFrame, days: int = DEFAULT_WARNING_DAYS) -> pd.DataFrame:
@@ -158,18 +214,18 @@ def get_upcoming_subscriptions(df: pd.DataFrame, days: int = DEFAULT_WARNING_DAY
     if df.empty:
         return pd.DataFrame()
     
-    # 筛选即将到期的订阅（包括所有类型）
-    upcoming = df[
-        (df['剩余天数'] >= 0) & 
-        (df['剩余天数'] <= days)
-    ].copy()
+    # 筛选即将到期的订阅（包括所有类型），直接在 numpy 数组上比较并按剩余天数稳定排序
+    remaining = df['剩余天数'].to_numpy()
+    rows = np.flatnonzero((remaining >= 0) & (remaining <= days))
+    order = rows[np.argsort(remaining[rows], kind='stable')]
     
-    return upcoming.sort_values('剩余天数')
+    return df.iloc[order]
 
 
 def filter_subscriptions_for_today(
     subscriptions: pd.DataFrame,
-    force: bool = False
+    force: bool = False,
+    today: Optional[date] = None
 ) -> tuple[pd.DataFrame, list[str]]:
     """
     过滤今天需要发送提醒的订阅
@@ -177,6 +233,7 @@ def filter_subscriptions_for_today(
     Args:
         subscriptions: 即将到期的订阅数据框
         force: 是否强制发送（忽略每日限制）
+        today: 当天日期，默认取当前日期
         
     Returns:
         tuple: (需要发送的订阅, 跳过的订阅名称列表)
@@ -184,13 +241,13 @@ def filter_subscriptions_for_today(
     if force or subscriptions.empty:
         return subscriptions, []
     
-    log_df = load_notification_log()
+    # 今日已发送名单只计算一次，逐个订阅做集合查找
+    sent_today = names_sent_today(load_notification_log(), today)
     to_send = []
     skipped = []
     
-    for idx, row in subscriptions.iterrows():
-        name = row['名称']
-        if should_send_reminder(name, log_df):
+    for idx, name in zip(subscriptions.index, subscriptions['名称'].tolist()):
+        if name not in sent_today:
             to_send.append(idx)
         else:
             skipped.append(name)
@@ -198,13 +255,49 @@ def filter_subscriptions_for_today(
     return subscriptions.loc[to_send].copy() if to_send else pd.DataFrame(), skipped
 
 
-def format_reminder_message(subscriptions: pd.DataFrame, currency_symbol: str = '฿') -> str:
+def _reminder_rows(subscriptions: pd.DataFrame):
+    """
+    按列取出提醒所需字段，逐行返回 (名称, 服务性质, 金额, 剩余天数)，避免 iterrows 的逐行装箱
+    """
+    return zip(
+        subscriptions['名称'].tolist(),
+        subscriptions['服务性质'].tolist(),
+        subscriptions['金额'].tolist(),
+        subscriptions['剩余天数'].tolist()
+    )
+
+
+def _now_text() -> str:
+    """当前时间的显示文本（精确到分钟）"""
+    return datetime.now().strftime('%Y-%m-%d %H:%M')
+
+
+def split_by_auto_renew(subscriptions: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    按是否自动续费拆分订阅（一次比较，按位置取两部分）
+    
+    Args:
+        subscriptions: 订阅数据框
+        
+    Returns:
+        tuple: (自动续费订阅, 需手动续期订阅)
+    """
+    # 用 eq(True) 而非直接转 bool：缺失值归入手动续期
+    auto = subscriptions['自动续费'].eq(True).to_numpy()
+    return subscriptions.iloc[auto], subscriptions.iloc[~auto]
+
+
+def format_reminder_message(subscriptions: pd.DataFrame, currency_symbol: str = '฿',
+                            sent_at: Optional[str] = None,
+                            split: Optional[tuple[pd.DataFrame, pd.DataFrame]] = None) -> str:
     """
     格式化提醒消息内容
     
     Args:
         subscriptions: 即将到期的订阅数据框
         currency_symbol: 货币符号
+        sent_at: 发送时间文本，默认取当前时间
+        split: 已拆分的 (自动续费, 手动续期) 订阅，默认在函数内拆分
         
     Returns:
         str: 格式化的消息内容
@@ -213,8 +306,7 @@ def format_reminder_message(subscriptions: pd.DataFrame, currency_symbol: str =
         return "✅ 近期没有需要关注的订阅续费。"
     
     # 分类订阅
-    auto_renew = subscriptions[subscriptions['自动续费'] == True]
-    manual_renew = subscriptions[subscriptions['自动续费'] != True]
+    auto_renew, manual_renew = split or split_by_auto_renew(subscriptions)
     
     lines = [
         "🔔 MySub Manager 到期提醒",
@@ -229,25 +321,25 @@ def format_reminder_message(subscriptions: pd.DataFrame, currency_symbol: str =
     if not auto_renew.empty:
         lines.append("🔄 【自动续费】以下订阅将自动扣款：")
         lines.append("")
-        for _, row in auto_renew.iterrows():
-            days_text = f"{row['剩余天数']} 天后" if row['剩余天数'] > 0 else "今天"
-            lines.append(f"📌 {row['名称']} ({row['服务性质']})")
-            lines.append(f"   💰 金额: {currency_symbol}{row['金额']:.2f}")
+        for name, service_type, amount, days in _reminder_rows(auto_renew):
+            days_text = f"{days} 天后" if days > 0 else "今天"
+            lines.append(f"📌 {name} ({service_type})")
+            lines.append(f"   💰 金额: {currency_symbol}{amount:.2f}")
             lines.append(f"   ⏰ 到期: {days_text}")
             lines.append("")
-            total_amount += row['金额']
+            total_amount += amount
     
     # 手动续费订阅
     if not manual_renew.empty:
         lines.append("⚠️ 【需手动续期】以下订阅如不续期将过期：")
         lines.append("")
-        for _, row in manual_renew.iterrows():
-            days_text = f"{row['剩余天数']} 天后" if row['剩余天数'] > 0 else "今天"
-            lines.append(f"📌 {row['名称']} ({row['服务性质']})")
-            lines.append(f"   💰 金额: {currency_symbol}{row['金额']:.2f}")
+        for name, service_type, amount, days in _reminder_rows(manual_renew):
+            days_text = f"{days} 天后" if days > 0 else "今天"
+            lines.append(f"📌 {name} ({service_type})")
+            lines.append(f"   💰 金额: {currency_symbol}{amount:.2f}")
             lines.append(f"   ⏰ 到期: {days_text}")
             lines.append("")
-            total_amount += row['金额']
+            total_amount += amount
     
     lines.append("=" * 40)
     lines.append(f"💸 总计: {currency_symbol}{total_amount:.2f}")
@@ -256,30 +348,13 @@ def format_reminder_message(subscriptions: pd.DataFrame, currency_symbol: str =
         lines.append("🔄 自动续费订阅如需取消，请及时处理。")
     if not manual_renew.empty:
         lines.append("⚠️ 手动续期订阅请记得续费，否则将失效。")
-    lines.append(f"发送时间: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    lines.append(f"发送时间: {sent_at or _now_text()}")
     
     return "\n".join(lines)
 
 
-def format_html_reminder(subscriptions: pd.DataFrame, currency_symbol: str = '฿') -> str:
-    """
-    格式化 HTML 格式的提醒邮件
-    
-    Args:
-        subscriptions: 即将到期的订阅数据框
-        currency_symbol: 货币符号
-        
-    Returns:
-        str: HTML 格式的邮件内容
-    """
-    if subscriptions.empty:
-        return "<p>✅ 近期没有需要关注的订阅续费。</p>"
-    
-    # 分类订阅
-    auto_renew = subscriptions[subscriptions['自动续费'] == True]
-    manual_renew = subscriptions[subscriptions['自动续费'] != True]
-    
-    html = f"""
+# HTML 邮件模板（模块加载时构建一次，调用时只填充动态字段）
+_HTML_HEAD = """
     <html>
     <head>
         <style>
@@ -302,14 +377,10 @@ def format_html_reminder(subscriptions: pd.DataFrame, currency_symbol: str = '
             <h1>🔔 MySub Manager 到期提醒</h1>
         </div>
         <div class="content">
-            <p>您有 <strong>{len(subscriptions)}</strong> 个订阅即将到期：</p>
+            <p>您有 <strong>{count}</strong> 个订阅即将到期：</p>
     """
-    
-    total_amount = 0
-    
-    # 自动续费订阅表格
-    if not auto_renew.empty:
-        html += """
+
+_HTML_AUTO_SECTION = """
             <div class="section-title auto-renew">🔄 【自动续费】以下订阅将自动扣款：</div>
             <table>
                 <tr>
@@ -319,21 +390,8 @@ def format_html_reminder(subscriptions: pd.DataFrame, currency_symbol: str = '
                     <th>剩余天数</th>
                 </tr>
         """
-        for _, row in auto_renew.iterrows():
-            html += f"""
-                <tr>
-                    <td>{row['名称']}</td>
-                    <td>{row['服务性质']}</td>
-                    <td class="amount">{currency_symbol}{row['金额']:.2f}</td>
-                    <td>{row['剩余天数']} 天</td>
-                </tr>
-            """
-            total_amount += row['金额']
-        html += "</table>"
-    
-    # 手动续费订阅表格
-    if not manual_renew.empty:
-        html += """
+
+_HTML_MANUAL_SECTION = """
             <div class="section-title manual-renew">⚠️ 【需手动续期】以下订阅如不续期将过期：</div>
             <table>
                 <tr>
@@ -343,41 +401,143 @@ def format_html_reminder(subscriptions: pd.DataFrame, currency_symbol: str = '
                     <th>剩余天数</th>
                 </tr>
         """
-        for _, row in manual_renew.iterrows():
-            html += f"""
+
+_HTML_ROW = """
                 <tr>
-                    <td>{row['名称']}</td>
-                    <td>{row['服务性质']}</td>
-                    <td class="amount">{currency_symbol}{row['金额']:.2f}</td>
-                    <td>{row['剩余天数']} 天</td>
+                    <td>{name}</td>
+                    <td>{service_type}</td>
+                    <td class="amount">{currency_symbol}{amount:.2f}</td>
+                    <td>{days} 天</td>
                 </tr>
             """
-            total_amount += row['金额']
-        html += "</table>"
-    
-    # 底部信息
-    html += f"""
+
+_HTML_TOTAL = """
             <p style="font-size: 18px; margin-top: 20px;">
                 💸 <strong>总计: {currency_symbol}{total_amount:.2f}</strong>
             </p>
     """
-    
-    if not auto_renew.empty:
-        html += '<p style="color: #666;">🔄 自动续费订阅如需取消，请及时处理。</p>'
-    if not manual_renew.empty:
-        html += '<div class="warning">⚠️ 手动续期订阅请记得续费，否则将失效！</div>'
-    
-    html += f"""
+
+_HTML_FOOTER = """
         </div>
         <div class="footer">
             <p>MySub Manager - 让每一笔订阅都清晰可见</p>
-            <p>发送时间: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
+            <p>发送时间: {sent_at}</p>
         </div>
     </body>
     </html>
     """
+
+
+def format_html_reminder(subscriptions: pd.DataFrame, currency_symbol: str = '฿',
+                         sent_at: Optional[str] = None,
+                         split: Optional[tuple[pd.DataFrame, pd.DataFrame]] = None) -> str:
+    """
+    格式化 HTML 格式的提醒邮件
+    
+    Args:
+        subscriptions: 即将到期的订阅数据框
+        currency_symbol: 货币符号
+        sent_at: 发送时间文本，默认取当前时间
+        split: 已拆分的 (自动续费, 手动续期) 订阅，默认在函数内拆分
+        
+    Returns:
+        str: HTML 格式的邮件内容
+    """
+    if subscriptions.empty:
+        return "<p>✅ 近期没有需要关注的订阅续费。</p>"
+    
+    # 分类订阅
+    auto_renew, manual_renew = split or split_by_auto_renew(subscriptions)
+    
+    parts = [_HTML_HEAD.format(count=len(subscriptions))]
+    
+    total_amount = 0
+    
+    # 自动续费订阅表格
+    if not auto_renew.empty:
+        parts.append(_HTML_AUTO_SECTION)
+        for name, service_type, amount, days in _reminder_rows(auto_renew):
+            parts.append(_HTML_ROW.format(
+                name=name,
+                service_type=service_type,
+                currency_symbol=currency_symbol,
+                amount=amount,
+                days=days
+            ))
+            total_amount += amount
+        parts.append("</table>")
+    
+    # 手动续费订阅表格
+    if not manual_renew.empty:
+        parts.append(_HTML_MANUAL_SECTION)
+        for name, service_type, amount, days in _reminder_rows(manual_renew):
+            parts.append(_HTML_ROW.format(
+                name=name,
+                service_type=service_type,
+                currency_symbol=currency_symbol,
+                amount=amount,
+                days=days
+            ))
+            total_amount += amount
+        parts.append("</table>")
+    
+    # 底部信息
+    parts.append(_HTML_TOTAL.format(currency_symbol=currency_symbol, total_amount=total_amount))
+    
+    if not auto_renew.empty:
+        parts.append('<p style="color: #666;">🔄 自动续费订阅如需取消，请及时处理。</p>')
+    if not manual_renew.empty:
+        parts.append('<div class="warning">⚠️ 手动续期订阅请记得续费，否则将失效！</div>')
+    
+    parts.append(_HTML_FOOTER.format(sent_at=sent_at or _now_text()))
     
-    return html
+    return "".join(parts)
+
+
+# 复用的 SMTP 连接及其对应的 (服务器, 端口, 用户名)
+_SMTP_CONN: Optional[smtplib.SMTP] = None
+_SMTP_KEY: Optional[tuple] = None
+
+
+def _close_smtp() -> None:
+    """关闭复用的 SMTP 连接"""
+    global _SMTP_CONN, _SMTP_KEY
+    if _SMTP_CONN is not None:
+        try:
+            _SMTP_CONN.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+    _SMTP_CONN = None
+    _SMTP_KEY = None
+
+
+atexit.register(_close_smtp)
+
+
+def _get_smtp(smtp_server: str, smtp_port: int, smtp_username: str, smtp_password: str) -> smtplib.SMTP:
+    """
+    获取已登录的 SMTP 连接：配置未变且连接仍然可用（NOOP 成功）时直接复用，
+    否则重新建立连接并完成 STARTTLS 与登录
+    """
+    global _SMTP_CONN, _SMTP_KEY
+    key = (smtp_server, smtp_port, smtp_username)
+    if _SMTP_CONN is not None and _SMTP_KEY == key:
+        try:
+            if _SMTP_CONN.noop()[0] == 250:
+                return _SMTP_CONN
+        except (smtplib.SMTPException, OSError):
+            pass
+    _close_smtp()
+    
+    server = smtplib.SMTP(smtp_server, smtp_port)
+    try:
+        server.starttls()
+        server.login(smtp_username, smtp_password)
+    except Exception:
+        server.close()
+        raise
+    _SMTP_CONN, _SMTP_KEY = server, key
+    return server
 
 
 def send_email_reminder(
@@ -413,24 +573,24 @@ def send_email_reminder(
     
     try:
         # 创建邮件
-        msg = MIMEMultipart('alternative')
+        msg = EmailMessage()
         msg['Subject'] = f'🔔 MySub Manager: {len(subscriptions)} 个订阅即将自动续费'
         msg['From'] = sender_email
         msg['To'] = recipient
         
-        # 纯文本版本
-        text_content = format_reminder_message(subscriptions, currency_symbol)
-        msg.attach(MIMEText(text_content, 'plain', 'utf-8'))
-        
-        # HTML 版本
-        html_content = format_html_reminder(subscriptions, currency_symbol)
-        msg.attach(MIMEText(html_content, 'html', 'utf-8'))
+        # 纯文本与 HTML 版本使用同一发送时间与同一拆分结果
+        sent_at = _now_text()
+        split = split_by_auto_renew(subscriptions)
+        msg.set_content(format_reminder_message(subscriptions, currency_symbol, sent_at, split))
+        msg.add_alternative(format_html_reminder(subscriptions, currency_symbol, sent_at, split), subtype='html')
         
-        # 发送邮件
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_username, smtp_password)
+        # 发送邮件（复用已登录的连接，失败时丢弃连接以便下次重连）
+        server = _get_smtp(smtp_server, smtp_port, smtp_username, smtp_password)
+        try:
             server.send_message(msg)
+        except Exception:
+            _close_smtp()
+            raise
         
         return True, f"成功发送提醒邮件到 {recipient}"
         
@@ -462,6 +622,9 @@ def check_and_remind(
     Returns:
         tuple[bool, str, list[str]]: (是否成功, 消息, 跳过的订阅列表)
     """
+    # 本次检查内「今天」保持不变，只取一次
+    today = datetime.now().date()
+    
     # 获取即将到期的订阅
     upcoming = get_upcoming_subscriptions(df, days)
     
@@ -469,7 +632,7 @@ def check_and_remind(
         return True, "没有即将到期的订阅需要提醒", []
     
     # 过滤今天需要发送的订阅
-    to_send, skipped = filter_subscriptions_for_today(upcoming, force)
+    to_send, skipped = filter_subscriptions_for_today(upcoming, force, today)
     
     if to_send.empty:
         return True, f"所有 {len(upcoming)} 个订阅今日已发送过提醒", skipped
@@ -483,17 +646,16 @@ def check_and_remind(
     
     if success:
         # 记录发送状态
-        log_df = load_notification_log()
-        for _, row in to_send.iterrows():
-            log_df = record_sent_notification(
-                log_df,
-                row['名称'],
-                row['剩余天数'],
-                email_sent=True
-            )
+        log_df = record_sent_notifications(
+            load_notification_log(),
+            to_send['名称'].tolist(),
+            to_send['剩余天数'].tolist(),
+            email_sent=True,
+            today=today
+        )
         
         # 清理旧日志并保存
-        log_df = cleanup_old_logs(log_df)
+        log_df = cleanup_old_logs(log_df, today=today)
         save_notification_log(log_df)
     
     return success, message, skipped
@@ -0,0 +1,44 @@
+"""
+提醒脚本数据加载模块 - 供 remind.py 等命令行场景使用
+
+功能:
+- 复用 load_subscriptions_core 读取并转换订阅数据
+- 计算剩余天数（整个加载过程只取一次当前时间）
+- 对已过期的自动续费订阅推进下次付费时间并写回
+"""
+import pandas as pd
+
+from .data_loader import (
+    apply_auto_renewals,
+    compute_remaining_days,
+    load_subscriptions_core,
+    save_subscriptions_core
+)
+
+
+def load_for_reminder() -> pd.DataFrame:
+    """
+    加载提醒所需的订阅数据
+
+    Returns:
+        pd.DataFrame: 订阅数据框（含剩余天数）
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 数据格式错误
+    """
+    df = load_subscriptions_core()
+    now = pd.Timestamp.now()
+    df['剩余天数'] = compute_remaining_days(df['下次付费时间'], now)
+
+    # 对已过期且自动续费的订阅，按周期推进「下次付费时间」并写回
+    df, changed = apply_auto_renewals(df, now)
+    if changed:
+        df['剩余天数'] = compute_remaining_days(df['下次付费时间'], now)
+        try:
+            save_subscriptions_core(df)
+            print("   🔄 已对到期的自动续费订阅更新下次付费时间并写回")
+        except Exception as e:
+            print(f"   ⚠️ 自动续期后保存失败: {e}")
+
+    return df
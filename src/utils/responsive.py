@@ -4,14 +4,8 @@
 import streamlit as st
 
 
-def get_responsive_css() -> str:
-    """
-    获取响应式 CSS 样式
-    
-    Returns:
-        str: CSS 样式字符串
-    """
-    return """
+# 静态样式，模块加载时构建一次
+_RESPONSIVE_CSS = """
     <style>
     /* 移动端样式优化 (< 768px) */
     @media (max-width: 768px) {
@@ -110,6 +104,16 @@ def get_responsive_css() -> str:
     """
 
 
+def get_responsive_css() -> str:
+    """
+    获取响应式 CSS 样式
+    
+    Returns:
+        str: CSS 样式字符串
+    """
+    return _RESPONSIVE_CSS
+
+
 def inject_responsive_css():
-    """注入响应式 CSS 到页面"""
+    """注入响应式 CSS 到页面（每次重跑都需重新输出，否则样式会被移除）"""
     st.markdown(get_responsive_css(), unsafe_allow_html=True)
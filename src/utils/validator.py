@@ -1,10 +1,14 @@
 """
 数据验证模块 - 提供订阅数据的验证功能
 """
-import pandas as pd
-from datetime import datetime
-from typing import Optional
-from decimal import Decimal, InvalidOperation
+import math
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Optional
+
+# pandas/numpy 仅批量验证需要，按需导入，标量验证不承担其导入开销
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
 
 
 class ValidationError(Exception):
@@ -53,6 +57,53 @@ def validate_subscription_data(data: dict) -> tuple[bool, Optional[str]]:
     return True, None
 
 
+def validate_subscription_frame(df: 'pd.DataFrame') -> 'pd.Series':
+    """
+    批量验证订阅数据（按列一次性计算，规则与 validate_subscription_data 一致）
+    
+    缺失值（NaN/NaT）与空字符串均视为未填写。
+    
+    Args:
+        df: 订阅数据框
+        
+    Returns:
+        pd.Series: 每行的首个错误信息，有效行为 None（可用 .isna() 得到有效掩码）
+    """
+    import numpy as np
+    import pandas as pd
+    
+    required_fields = ['名称', '服务性质', '订阅类型', '金额', '下次付费时间']
+    
+    # 按校验顺序收集 (条件, 错误信息)，np.select 取每行第一个命中的条件
+    checks = []
+    for field in required_fields:
+        if field not in df.columns:
+            # 整列缺失时每行都在此处失败，后续检查无需计算
+            checks.append((pd.Series(True, index=df.index), f"缺少必填字段: {field}"))
+            break
+        col = df[field]
+        checks.append((col.isna() | col.eq(''), f"缺少必填字段: {field}"))
+    else:
+        # 非字符串名称经 .str 后为 NaN，比较结果为 False
+        names = df['名称'].astype(object)
+        checks.append((~(names.str.strip().str.len() > 0), "服务名称不能为空"))
+        checks.append((names.str.len() > 100, "服务名称过长（最多 100 字符）"))
+        
+        amounts = pd.to_numeric(df['金额'], errors='coerce')
+        checks.append((amounts.isna(), "金额格式无效"))
+        checks.append((amounts <= 0, "金额必须大于 0"))
+        checks.append((amounts > 1_000_000, "金额超出合理范围"))
+        
+        valid_dates = validate_date_array(df['下次付费时间'])
+        checks.append((pd.Series(~valid_dates, index=df.index), "日期格式无效，请使用 YYYY-MM-DD 格式"))
+    
+    # 可空类型（Int64、string 等）比较结果可能含 NA，按未命中处理
+    conditions = [mask.to_numpy(dtype=bool, na_value=False) for mask, _ in checks]
+    messages = [message for _, message in checks]
+    errors = np.select(conditions, messages, default=None)
+    return pd.Series(errors, index=df.index, dtype=object)
+
+
 def validate_date(date_value) -> bool:
     """
     验证日期格式是否正确
@@ -66,16 +117,19 @@ def validate_date(date_value) -> bool:
     if date_value is None:
         return False
     
-    # 如果已经是 datetime 类型
+    # datetime 类型（pandas Timestamp 是 datetime 的子类）
     if isinstance(date_value, datetime):
         return True
     
-    # 如果是 pandas Timestamp
-    if isinstance(date_value, pd.Timestamp):
-        return True
-    
     # 如果是字符串，尝试解析
     if isinstance(date_value, str):
+        # 标准 YYYY-MM-DD 先走 C 实现的 fromisoformat，其余写法（如 2026-1-5）仍交给 strptime
+        if len(date_value) == 10 and date_value[4] == '-' and date_value[7] == '-':
+            try:
+                date.fromisoformat(date_value)
+                return True
+            except ValueError:
+                pass
         try:
             datetime.strptime(date_value, '%Y-%m-%d')
             return True
@@ -85,6 +139,22 @@ def validate_date(date_value) -> bool:
     return False
 
 
+def validate_date_array(values) -> 'np.ndarray':
+    """
+    批量验证日期（一次向量化解析，无效值转为 NaT 而非抛出异常）
+    
+    Args:
+        values: 日期序列（字符串、datetime 或 datetime64）
+        
+    Returns:
+        np.ndarray: 每个元素是否为有效日期
+    """
+    import pandas as pd
+    
+    parsed = pd.to_datetime(pd.Series(values, copy=False), format='%Y-%m-%d', errors='coerce')
+    return parsed.notna().to_numpy()
+
+
 def validate_amount(amount) -> tuple[bool, float]:
     """
     验证并转换金额
@@ -95,17 +165,47 @@ def validate_amount(amount) -> tuple[bool, float]:
     Returns:
         tuple[bool, float]: (是否有效, 转换后的金额)
     """
+    # 布尔值不视为金额（float(True) 会得到 1.0）
+    if isinstance(amount, bool):
+        return False, 0.0
+    
+    # float() 对数字和十进制字符串都是精确舍入，无需经 Decimal 中转
     try:
-        # 使用 Decimal 避免浮点误差
-        decimal_amount = Decimal(str(amount))
-        float_amount = float(decimal_amount)
-        
-        if float_amount <= 0:
-            return False, 0.0
-        
-        return True, round(float_amount, 2)
-    except (InvalidOperation, ValueError, TypeError):
+        float_amount = float(amount)
+    except (ValueError, TypeError):
         return False, 0.0
+    
+    if not math.isfinite(float_amount) or float_amount <= 0:
+        return False, 0.0
+    
+    return True, round(float_amount, 2)
+
+
+def validate_amount_array(values) -> tuple['np.ndarray', 'np.ndarray']:
+    """
+    批量验证并转换金额（规则与 validate_amount 一致，整列一次计算）
+    
+    两位小数仍用内置 round()：np.round 先乘 100 再取整，边界值（如 12.345）会与逐个验证结果不同。
+    
+    Args:
+        values: 金额序列（数字或数字字符串）
+        
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (每个金额是否有效, 转换后的金额，无效为 0.0)
+    """
+    import numpy as np
+    import pandas as pd
+    
+    series = pd.Series(values, copy=False)
+    if pd.api.types.is_bool_dtype(series):
+        # 布尔值不视为金额
+        return np.zeros(len(series), dtype=bool), np.zeros(len(series))
+    
+    amounts = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    valid = np.isfinite(amounts) & (amounts > 0)
+    rounded = np.zeros(len(amounts))
+    rounded[valid] = [round(amount, 2) for amount in amounts[valid].tolist()]
+    return valid, rounded
 
 
 def validate_service_type(service_type: str, valid_types: list[str]) -> bool:
@@ -136,7 +236,7 @@ def validate_subscribe_type(subscribe_type: str, valid_types: list[str]) -> bool
     return subscribe_type in valid_types
 
 
-def validate_dataframe(df: pd.DataFrame, required_columns: list[str]) -> tuple[bool, list[str]]:
+def validate_dataframe(df: 'pd.DataFrame', required_columns: list[str]) -> tuple[bool, list[str]]:
     """
     验证 DataFrame 是否包含所有必需列
     
@@ -147,7 +247,9 @@ def validate_dataframe(df: pd.DataFrame, required_columns: list[str]) -> tuple[b
     Returns:
         tuple[bool, list[str]]: (是否有效, 缺失列列表)
     """
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    # 列名集合做哈希查找，避免每次经 Index.__contains__ 的开销
+    columns = frozenset(df.columns)
+    missing_columns = [col for col in required_columns if col not in columns]
     return len(missing_columns) == 0, missing_columns
 
 
@@ -173,3 +275,20 @@ def sanitize_string(value: str, max_length: int = 255) -> str:
         value = value[:max_length]
     
     return value
+
+
+def sanitize_string_array(values, max_length: int = 255) -> 'np.ndarray':
+    """
+    批量清理字符串输入（规则与 sanitize_string 一致，整列一次处理）
+    
+    Args:
+        values: 输入序列（非字符串元素先转为字符串）
+        max_length: 最大长度
+        
+    Returns:
+        np.ndarray: 清理后的字符串数组（object 类型）
+    """
+    import pandas as pd
+    
+    series = pd.Series(values, dtype=object).astype(str)
+    return series.str.strip().str.slice(0, max_length).to_numpy(dtype=object)
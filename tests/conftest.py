@@ -0,0 +1,21 @@
+"""
+测试共享夹具
+"""
+import pytest
+import pandas as pd
+
+
+@pytest.fixture(scope="session")
+def sample_subscription_df():
+    """创建测试用的订阅数据框（整个测试会话只构建一次，测试中不得修改）"""
+    return pd.DataFrame({
+        '名称': ['Netflix', 'Claude Pro', 'Spotify'],
+        '供应商': ['Netflix Inc.', 'Anthropic', 'Spotify AB'],
+        '服务性质': ['视频', 'AI', '音乐'],
+        '订阅类型': ['月付', '年付', '月付'],
+        '金额': [419.0, 7500.0, 149.0],
+        '月均成本': [419.0, 625.0, 149.0],
+        '下次付费时间': pd.to_datetime(['2026-02-01', '2026-12-01', '2026-02-15']),
+        '剩余天数': [21, 324, 35],
+        '自动续费': [True, False, True]
+    })
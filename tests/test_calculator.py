@@ -3,49 +3,58 @@
 """
 import pytest
 import pandas as pd
-from pathlib import Path
-import sys
 
-# 添加项目根目录到 Python 路径
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from src.utils.data_loader import calculate_monthly_cost
+from src.utils.data_loader import calculate_monthly_cost, calculate_monthly_costs
 
 
 class TestCalculator:
     """测试财务计算逻辑"""
     
-    def test_monthly_cost_monthly_cycle(self):
-        """测试月付计算"""
-        row = pd.Series({
-            '金额': 100.0,
-            '订阅类型': '月付'
-        })
-        assert calculate_monthly_cost(row) == 100.0
+    @pytest.mark.parametrize("amount,cycle,expected", [
+        (100.0, '月付', 100.0),
+        (1200.0, '年付', 100.0),
+        (300.0, '季付', 100.0),
+        (999.0, '终身', 0.0),
+    ])
+    def test_monthly_cost(self, amount, cycle, expected):
+        """测试月付、年付、季付与终身订阅的月均成本"""
+        row = pd.Series({'金额': amount, '订阅类型': cycle})
+        assert calculate_monthly_cost(row) == expected
     
-    def test_monthly_cost_yearly_cycle(self):
-        """测试年付计算"""
-        row = pd.Series({
-            '金额': 1200.0,
-            '订阅类型': '年付'
+    def test_vectorized_matches_row_wise(self):
+        """测试向量化月均成本与逐行计算一致"""
+        df = pd.DataFrame({
+            '金额': [100.0, 1200.0, 300.0, 999.0, 600.0, 50.0, 19.99],
+            '订阅类型': ['月付', '年付', '季付', '终身', '半年付', '未知', '年付'],
+            '货币': ['THB', 'THB', 'USD', 'CNY', 'EUR', 'THB', 'USD']
         })
-        assert calculate_monthly_cost(row) == 100.0
-    
-    def test_monthly_cost_quarterly_cycle(self):
-        """测试季付计算"""
-        row = pd.Series({
-            '金额': 300.0,
-            '订阅类型': '季付'
+        expected = df.apply(calculate_monthly_cost, axis=1).astype(float)
+        pd.testing.assert_series_equal(calculate_monthly_costs(df), expected)
+
+    def test_vectorized_categorical_columns(self):
+        """测试分类列（含缺失值）与普通列的计算结果一致"""
+        df = pd.DataFrame({
+            '金额': [100.0, 1200.0, 300.0, 999.0, 50.0],
+            '订阅类型': ['月付', '年付', None, '终身', '季付'],
+            '货币': ['THB', 'USD', 'CNY', None, 'XXX']
         })
-        assert calculate_monthly_cost(row) == 100.0
-    
-    def test_monthly_cost_lifetime(self):
-        """测试终身订阅"""
-        row = pd.Series({
-            '金额': 999.0,
-            '订阅类型': '终身'
+        categorical = df.astype({'订阅类型': 'category', '货币': 'category'})
+        pd.testing.assert_series_equal(calculate_monthly_costs(categorical), calculate_monthly_costs(df))
+
+    def test_vectorized_thb_only_skips_rates(self, monkeypatch):
+        """测试全部为泰铢时不获取汇率"""
+        from src.utils import currency
+
+        def fail():
+            raise AssertionError("不应获取汇率")
+
+        monkeypatch.setattr(currency, 'get_float_rates', fail)
+        df = pd.DataFrame({
+            '金额': [120.0, 30.0],
+            '订阅类型': ['年付', '月付'],
+            '货币': ['THB', None]
         })
-        assert calculate_monthly_cost(row) == 0.0
+        assert calculate_monthly_costs(df).tolist() == [10.0, 30.0]
 
 
 class TestDataValidation:
@@ -3,18 +3,15 @@
 """
 import pytest
 from decimal import Decimal
-from pathlib import Path
-import sys
-
-# 添加项目根目录到 Python 路径
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.utils import currency
 from src.utils.currency import (
     convert_to_thb,
     convert_from_thb,
     get_currency_symbol,
     format_currency,
     SUPPORTED_CURRENCIES,
+    CURRENCY_OPTIONS,
     CURRENCY_SYMBOLS,
     FALLBACK_RATES
 )
@@ -42,6 +39,15 @@ class TestCurrencyConversion:
         result = convert_from_thb(3550.0, 'USD')
         # 应该小于原值（因为 USD 对 THB 汇率大于 1）
         assert result < 3550.0
+    
+    def test_thb_conversion_skips_rates(self, monkeypatch):
+        """测试 THB 与 THB 之间转换不获取汇率"""
+        def fail():
+            raise AssertionError("不应获取汇率")
+        
+        monkeypatch.setattr(currency, 'get_float_rates', fail)
+        assert convert_to_thb(100.0, 'THB') == 100.0
+        assert convert_from_thb(100.0, 'THB') == 100.0
 
 
 class TestCurrencySymbols:
@@ -83,11 +89,56 @@ class TestSupportedCurrencies:
         for currency in major_currencies:
             assert currency in SUPPORTED_CURRENCIES
     
+    def test_supported_currencies_is_frozenset(self):
+        """测试支持货币为集合，下拉选项与之一致且 THB 在首位"""
+        assert isinstance(SUPPORTED_CURRENCIES, frozenset)
+        assert SUPPORTED_CURRENCIES == frozenset(CURRENCY_OPTIONS)
+        assert len(CURRENCY_OPTIONS) == len(SUPPORTED_CURRENCIES)
+        assert CURRENCY_OPTIONS[0] == 'THB'
+    
     def test_fallback_rates_have_thb(self):
         """测试备用汇率包含 THB"""
         assert 'THB' in FALLBACK_RATES
         assert FALLBACK_RATES['THB'] == Decimal('1.0')
 
 
+
+class TestRateCache:
+    """测试进程内汇率缓存"""
+    
+    def test_repeated_calls_hit_cache(self, monkeypatch):
+        """测试重复获取汇率只解析一次"""
+        calls = []
+        
+        def fake_resolve(force_refresh):
+            calls.append(force_refresh)
+            return {'THB': Decimal('1.0'), 'USD': Decimal('35.50')}
+        
+        monkeypatch.setattr(currency, '_resolve_exchange_rates', fake_resolve)
+        monkeypatch.setattr(currency, '_rates_cache', None)
+        
+        first = currency.get_exchange_rates()
+        second = currency.get_exchange_rates()
+        assert first is second
+        assert len(calls) == 1
+    
+    def test_force_refresh_and_invalidate_bypass_cache(self, monkeypatch):
+        """测试强制刷新与手动失效都会重新获取"""
+        calls = []
+        
+        def fake_resolve(force_refresh):
+            calls.append(force_refresh)
+            return {'THB': Decimal('1.0')}
+        
+        monkeypatch.setattr(currency, '_resolve_exchange_rates', fake_resolve)
+        monkeypatch.setattr(currency, '_rates_cache', None)
+        
+        currency.get_exchange_rates()
+        currency.get_exchange_rates(force_refresh=True)
+        currency._invalidate_rate_cache()
+        currency.get_exchange_rates()
+        assert calls == [False, True, False]
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
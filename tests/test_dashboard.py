@@ -0,0 +1,30 @@
+"""
+测试仪表盘分组统计与快速统计渲染
+"""
+import numpy as np
+import pandas as pd
+
+from src.components.dashboard import _bincount_by, render_quick_stats
+
+
+def test_bincount_by_sums_and_counts():
+    """按类别求和与计数，结果降序且只含出现过的类别"""
+    column = pd.Series(['AI', '视频', 'AI', None], dtype='category')
+    assert _bincount_by(column, np.array([1.0, 5.0, 2.0, 9.0])) == [('视频', 5.0), ('AI', 3.0)]
+    assert _bincount_by(column) == [('AI', 2), ('视频', 1)]
+
+
+def test_quick_stats_zero_monthly_total(sample_subscription_df):
+    """全部为终身订阅（月度总额为 0）时快速统计不应除零"""
+    df = sample_subscription_df.assign(订阅类型='终身', 月均成本=0.0)
+    cost = df['月均成本'].to_numpy(dtype=np.float64)
+    stats = {
+        'total_count': len(df),
+        'monthly_total': float(cost.sum()),
+        'category_stats': _bincount_by(df['服务性质'], cost),
+        'cycle_stats': _bincount_by(df['订阅类型']),
+        'top3': df.nlargest(3, '月均成本')[['名称', '服务性质', '月均成本']],
+        'supplier_stats': [],
+    }
+    assert stats['monthly_total'] == 0.0
+    render_quick_stats(df, stats)
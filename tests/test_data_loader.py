@@ -0,0 +1,103 @@
+"""
+测试数据加载辅助函数：剩余天数计算与按剩余天数二分切片。
+"""
+import numpy as np
+import pandas as pd
+
+from src.utils import data_loader
+from src.utils.data_loader import (
+    apply_auto_renewals,
+    compute_remaining_days,
+    remaining_days_slice,
+    save_subscriptions_core,
+)
+
+
+def test_compute_remaining_days_matches_dt_days():
+    """整数整除结果应与 timedelta 的 .dt.days 一致（含负数向下取整）"""
+    now = pd.Timestamp('2026-03-10 15:30:00')
+    due = pd.Series(pd.to_datetime(['2026-03-10', '2026-03-11', '2026-03-01', '2027-03-10']))
+    expected = (due - now).dt.days
+    pd.testing.assert_series_equal(compute_remaining_days(due, now), expected)
+    assert compute_remaining_days(due, now).tolist() == [-1, 0, -10, 364]
+
+
+def test_compute_remaining_days_missing_date():
+    """缺失日期返回 NaN"""
+    now = pd.Timestamp('2026-03-10 08:00:00')
+    due = pd.Series(pd.to_datetime(['2026-03-12', None]))
+    result = compute_remaining_days(due, now)
+    assert result.iloc[0] == 1
+    assert np.isnan(result.iloc[1])
+
+
+def test_remaining_days_slice_matches_mask():
+    """有序数据上的切片结果应与布尔掩码筛选一致"""
+    days = [-30, -1, 0, 3, 7, 7, 8, 120]
+    df = pd.DataFrame({'剩余天数': days})
+    rows = remaining_days_slice(df, 0, 7)
+    expected = df[(df['剩余天数'] >= 0) & (df['剩余天数'] <= 7)]
+    pd.testing.assert_frame_equal(df.iloc[rows], expected)
+
+
+def test_remaining_days_slice_unbounded_excludes_missing():
+    """上限为无穷大时包含全部未到期订阅，末尾的缺失值不计入"""
+    df = pd.DataFrame({'剩余天数': [-5.0, 0.0, 10.0, np.nan]})
+    rows = remaining_days_slice(df, 0, np.inf)
+    assert df.iloc[rows]['剩余天数'].tolist() == [0.0, 10.0]
+
+
+def test_remaining_days_slice_empty():
+    """没有符合条件的订阅时返回空区间"""
+    df = pd.DataFrame({'剩余天数': [-10, -3]})
+    rows = remaining_days_slice(df, 0, 7)
+    assert df.iloc[rows].empty
+
+
+def test_remaining_days_slice_unsorted_falls_back_to_mask():
+    """未排序（或缺失值不在末尾）的数据退回布尔掩码，结果仍与筛选一致"""
+    for days in ([8, 0, 120, 3, -1, 7], [0, np.nan, 3, 10]):
+        df = pd.DataFrame({'剩余天数': days})
+        rows = remaining_days_slice(df, 0, 7)
+        expected = df[(df['剩余天数'] >= 0) & (df['剩余天数'] <= 7)]
+        pd.testing.assert_frame_equal(df.iloc[rows], expected)
+
+
+def test_save_restores_file_row_order(tmp_path, monkeypatch):
+    """按付费时间排序后的数据写回时恢复文件中的行顺序"""
+    path = tmp_path / 'subscriptions.csv'
+    monkeypatch.setattr(data_loader, 'SUBSCRIPTIONS_FILE', path)
+    df = pd.DataFrame({
+        '名称': ['B', 'A', 'C'],
+        '下次付费时间': pd.to_datetime(['2026-05-01', '2026-03-01', '2026-04-01']),
+        '自动续费': [True, False, True],
+    })
+    save_subscriptions_core(df.sort_values('下次付费时间', kind='stable'))
+    assert pd.read_csv(path, encoding=data_loader.CSV_ENCODING)['名称'].tolist() == ['B', 'A', 'C']
+
+
+def test_apply_auto_renewals_uses_given_now():
+    """传入的当前时间决定续期推进的终点"""
+    now = pd.Timestamp('2026-03-10 09:00:00')
+    df = pd.DataFrame({
+        '下次付费时间': pd.to_datetime(['2026-01-05', '2026-03-01', '2026-02-01']),
+        '订阅类型': ['月付', '年付', '终身'],
+        '自动续费': [True, True, True],
+    })
+    df['剩余天数'] = compute_remaining_days(df['下次付费时间'], now)
+    df, changed = apply_auto_renewals(df, now)
+    assert changed
+    assert df['下次付费时间'].tolist() == [
+        pd.Timestamp('2026-04-05'),
+        pd.Timestamp('2027-03-01'),
+        pd.Timestamp('2026-02-01'),
+    ]
+
+
+def test_session_fingerprint_only_reuses_loaded_frame(monkeypatch):
+    """只有传入 main() 加载的同一数据框时才复用已记录的指纹"""
+    df = pd.DataFrame({'名称': ['A', 'B'], '金额': [1.0, 2.0]})
+    subset = df.iloc[:1]
+    monkeypatch.setattr(data_loader.st, 'session_state', {'df_fp': (id(df), 'loaded-fp')})
+    assert data_loader.session_fingerprint(df) == 'loaded-fp'
+    assert data_loader.session_fingerprint(subset) == data_loader.dataframe_fingerprint(subset)
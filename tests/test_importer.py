@@ -0,0 +1,52 @@
+"""
+测试导入模块
+"""
+import pytest
+import pandas as pd
+
+from src.utils.importer import merge_by_name, parse_boolean, parse_boolean_series
+
+
+class TestMergeByName:
+    """测试按名称合并导入数据"""
+
+    def test_updates_in_place_and_appends(self):
+        """测试已存在的名称原位更新，新名称追加到末尾"""
+        existing = pd.DataFrame({
+            '名称': ['Netflix', 'Spotify', 'Claude Pro'],
+            '金额': [419.0, 149.0, 7500.0]
+        })
+        imported = pd.DataFrame({
+            '名称': ['ChatGPT', 'Spotify'],
+            '金额': [700.0, 159.0]
+        })
+        result = merge_by_name(existing, imported)
+        assert result['名称'].tolist() == ['Netflix', 'Spotify', 'Claude Pro', 'ChatGPT']
+        assert result['金额'].tolist() == [419.0, 159.0, 7500.0, 700.0]
+
+    def test_duplicate_import_rows_keep_last(self):
+        """测试导入数据重名时以最后一条为准，只更新第一条同名现有记录"""
+        existing = pd.DataFrame({
+            '名称': ['Netflix', 'Netflix'],
+            '金额': [419.0, 299.0]
+        })
+        imported = pd.DataFrame({
+            '名称': ['YouTube', 'Netflix', 'YouTube', 'Netflix'],
+            '金额': [1.0, 2.0, 3.0, 4.0]
+        })
+        result = merge_by_name(existing, imported)
+        assert result['名称'].tolist() == ['Netflix', 'Netflix', 'YouTube']
+        assert result['金额'].tolist() == [4.0, 299.0, 3.0]
+
+
+class TestParseBoolean:
+    """测试布尔值解析"""
+
+    def test_series_matches_scalar(self):
+        """测试整列解析与逐个解析结果一致"""
+        values = pd.Series([' true', 'Y', '是', '1', 'no', '假', None, True, False, 1, 'x'], dtype=object)
+        assert parse_boolean_series(values).tolist() == values.apply(parse_boolean).tolist()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
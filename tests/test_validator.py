@@ -3,22 +3,22 @@
 """
 import pytest
 from datetime import datetime, date
+import numpy as np
 import pandas as pd
-from pathlib import Path
-import sys
-
-# 添加项目根目录到 Python 路径
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.utils.validator import (
     ValidationError,
     validate_subscription_data,
+    validate_subscription_frame,
     validate_date,
+    validate_date_array,
     validate_amount,
+    validate_amount_array,
     validate_service_type,
     validate_subscribe_type,
     validate_dataframe,
-    sanitize_string
+    sanitize_string,
+    sanitize_string_array
 )
 
 
@@ -86,6 +86,29 @@ class TestSubscriptionValidation:
         }
         is_valid, error = validate_subscription_data(data)
         assert is_valid is False
+    
+    def test_frame_matches_scalar(self):
+        """测试批量验证与逐条验证结果一致"""
+        base = {'名称': 'Netflix', '服务性质': '视频', '订阅类型': '月付', '金额': 419.0, '下次付费时间': '2026-02-01'}
+        records = [
+            base,
+            {**base, '名称': '   '},
+            {**base, '名称': 'x' * 101},
+            {**base, '服务性质': ''},
+            {**base, '金额': 'abc'},
+            {**base, '金额': '0'},
+            {**base, '金额': 2_000_000},
+            {**base, '下次付费时间': '2026/02/01'},
+            {**base, '下次付费时间': pd.Timestamp('2026-02-01')},
+        ]
+        df = pd.DataFrame(records)
+        expected = [validate_subscription_data(record)[1] for record in records]
+        assert validate_subscription_frame(df).tolist() == expected
+    
+    def test_frame_missing_column(self):
+        """测试批量验证缺少整列"""
+        df = pd.DataFrame({'名称': ['Netflix'], '金额': [419.0]})
+        assert validate_subscription_frame(df).tolist() == ['缺少必填字段: 服务性质']
 
 
 class TestDateValidation:
@@ -107,9 +130,20 @@ class TestDateValidation:
         """测试无效日期字符串"""
         assert validate_date('2026/01/15') is False
     
+    def test_date_string_variants(self):
+        """测试非补零写法与不存在的日期"""
+        assert validate_date('2026-1-5') is True
+        assert validate_date('2026-02-30') is False
+        assert validate_date('2026-W03-1') is False
+    
     def test_none_date(self):
         """测试 None 日期"""
         assert validate_date(None) is False
+    
+    def test_date_array(self):
+        """测试批量日期验证"""
+        values = ['2026-01-15', '2026/01/15', '2026-02-30', None, pd.Timestamp('2026-03-01')]
+        assert validate_date_array(values).tolist() == [True, False, False, False, True]
 
 
 class TestAmountValidation:
@@ -142,6 +176,24 @@ class TestAmountValidation:
         """测试无效字符串金额"""
         is_valid, amount = validate_amount('abc')
         assert is_valid is False
+    
+    def test_invalid_amount_non_finite(self):
+        """测试非有限值与布尔值金额"""
+        for value in ['nan', float('inf'), '-inf', True]:
+            assert validate_amount(value) == (False, 0.0)
+    
+    def test_amount_array(self):
+        """测试批量金额验证"""
+        valid, amounts = validate_amount_array(np.array([100, 99.99, -50, np.nan]))
+        assert valid.tolist() == [True, True, False, False]
+        assert amounts.tolist() == [100.0, 99.99, 0.0, 0.0]
+    
+    def test_amount_array_matches_scalar(self):
+        """测试批量金额验证与逐个验证结果一致"""
+        values = ['50.50', 'abc', None, 0, 1_000, 'inf', ' 12.345 ']
+        valid, amounts = validate_amount_array(values)
+        expected = [validate_amount(value) for value in values]
+        assert list(zip(valid.tolist(), amounts.tolist())) == expected
 
 
 class TestTypeValidation:
@@ -180,6 +232,14 @@ class TestDataFrameValidation:
         assert is_valid is False
         assert 'B' in missing
         assert 'C' in missing
+    
+    def test_validate_dataframe_many_columns(self):
+        """测试多列数据框，缺失列按要求顺序返回"""
+        df = pd.DataFrame(columns=[f'col{i}' for i in range(200)])
+        required = [f'col{i}' for i in range(0, 400, 8)]
+        is_valid, missing = validate_dataframe(df, required)
+        assert is_valid is False
+        assert missing == [f'col{i}' for i in range(200, 400, 8)]
 
 
 class TestSanitizeString:
@@ -200,6 +260,12 @@ class TestSanitizeString:
         """测试非字符串转换"""
         result = sanitize_string(12345)
         assert result == '12345'
+    
+    def test_array_matches_scalar(self):
+        """测试批量清理与逐个清理结果一致"""
+        values = np.array(['  x ', 'abcdefghij', 12345, None, 1.5, '\t中文 '], dtype=object)
+        result = sanitize_string_array(values, max_length=5)
+        assert result.tolist() == [sanitize_string(value, max_length=5) for value in values]
 
 
 if __name__ == '__main__':